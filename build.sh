@@ -3,4 +3,5 @@ set -o errexit
 pip install -r requirements.txt
 python manage.py collectstatic --noinput
 python manage.py makemigrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+python manage.py refresh_opening_hours
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,26 +46,44 @@ MIDDLEWARE = [
     # WhiteNoise AFTER SecurityMiddleware
     'whitenoise.middleware.WhiteNoiseMiddleware',
 
+    # Outermost after static files so its totals cover everything below
+    'core.instrumentation.RequestTimingMiddleware',
+
+    # Before anything that reads the database (sessions, auth)
+    'core.middleware.ReplicaPinningMiddleware',
+
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.UserProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
 
+# Production keeps compiled templates in memory with the cached loader.
+# Defaults to on when DEBUG is off; override with TEMPLATE_CACHE=True/False.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if os.getenv("TEMPLATE_CACHE", str(not DEBUG)) == "True":
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus render timing for RequestTimingMiddleware
+        'BACKEND': 'core.instrumentation.TimedDjangoTemplates',
         "DIRS": [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.profile',
             ],
         },
     },
@@ -90,6 +109,133 @@ DATABASES = {
     }
 }
 
+# Connection reuse. By default each worker keeps its connection open for
+# DB_CONN_MAX_AGE seconds instead of doing a new TLS handshake per request.
+# DB_POOL=True switches to psycopg's built-in pool instead (Django requires
+# CONN_MAX_AGE=0 with pooling). Settings are logged at startup by CoreConfig.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True"
+
+if os.getenv("DB_POOL", "False") == "True":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+# Read replicas. PG_REPLICA_HOSTS is a comma-separated list of hosts that
+# share the primary's credentials; each becomes a "replicaN" alias that
+# core.routers.PrimaryReplicaRouter sends reads to.
+REPLICA_DATABASES = []
+for index, host in enumerate(filter(None, os.getenv("PG_REPLICA_HOSTS", "").split(",")), start=1):
+    alias = f"replica{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+
+# After a write, keep that browser on the primary for this long
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; set CACHE_DIR for a file-based cache shared by all
+# workers on one host, or REDIS_URL (requires the `redis` package) to share
+# it across hosts.
+
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_DIR = os.getenv("CACHE_DIR")
+# Django's default of 300 entries is too small once every spot card is
+# cached as its own fragment.
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+elif CACHE_DIR:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+            "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "studyhive",
+            "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+        }
+    }
+
+# Upper bound on how long a cached page or fragment lives. Model signals
+# invalidate entries early; this only limits drift between workers that
+# each keep their own local-memory cache.
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+
+# Login/registration throttling (core.ratelimit). Counters live in the cache
+# above, so use a shared backend when running several workers.
+RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "True") == "True"
+# Number of reverse proxies in front of the app that append to
+# X-Forwarded-For (1 on Render). Requests without the header, as in local
+# development, use REMOTE_ADDR; set 0 only when nothing sits in front.
+RATELIMIT_PROXY_COUNT = int(os.getenv("RATELIMIT_PROXY_COUNT", "1"))
+
+# refresh_opening_hours (core/hours.py) ends the check-ins at spots that have
+# just closed, one save() per check-in like the check-in toggle. Off by
+# default: people stay checked in until they check out themselves.
+AUTO_CHECKOUT_ON_CLOSE = os.getenv("AUTO_CHECKOUT_ON_CLOSE", "False") == "True"
+
+# Per-request timing (core/instrumentation.py): request metrics plus a JSON
+# line per request on the "core.requests" logger at DEBUG. Requests taking
+# SLOW_REQUEST_MS or longer log at WARNING with their SLOW_QUERY_COUNT
+# slowest queries. The Server-Timing header exposes query counts and times,
+# so it is only sent with DEBUG on or SERVER_TIMING_HEADER=True.
+REQUEST_TIMING_ENABLED = os.getenv("REQUEST_TIMING_ENABLED", "True") == "True"
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "False") == "True"
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_QUERY_COUNT = int(os.getenv("SLOW_QUERY_COUNT", "5"))
+
+# /metrics (core/metrics.py) needs "Authorization: Bearer <METRICS_TOKEN>";
+# without a token it is only served with DEBUG on. Request metrics are
+# recorded by RequestTimingMiddleware. Under gunicorn also set
+# PROMETHEUS_MULTIPROC_DIR so the workers' metrics are added together.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Geocoding (core/geocoding.py). GEOCODER=core.geocoding.GazetteerGeocoder
+# answers offline from a small Cebu gazetteer for tests and development.
+GEOCODER = os.getenv("GEOCODER", "core.geocoding.NominatimGeocoder")
+GEOCODER_URL = os.getenv("GEOCODER_URL", "https://nominatim.openstreetmap.org")
+GEOCODER_USER_AGENT = os.getenv("GEOCODER_USER_AGENT", "StudyHive/1.0 (https://studyhive-4bn3.onrender.com)")
+GEOCODER_COUNTRIES = os.getenv("GEOCODER_COUNTRIES", "ph")
+GEOCODER_TIMEOUT = float(os.getenv("GEOCODER_TIMEOUT", "5"))
+# How long cached answers are trusted; misses are retried sooner
+GEOCODE_CACHE_DAYS = int(os.getenv("GEOCODE_CACHE_DAYS", "90"))
+GEOCODE_MISS_DAYS = int(os.getenv("GEOCODE_MISS_DAYS", "7"))
+
+# Directions proxy (core/routing.py). ROUTER=core.routing.StraightLineRouter
+# works offline. Endpoints are snapped to ROUTE_GRID_DECIMALS for caching.
+ROUTER = os.getenv("ROUTER", "core.routing.OSRMRouter")
+ROUTER_URL = os.getenv("ROUTER_URL", "https://router.project-osrm.org")
+ROUTER_PROFILE = os.getenv("ROUTER_PROFILE", "driving")
+ROUTER_TIMEOUT = float(os.getenv("ROUTER_TIMEOUT", "5"))
+ROUTE_GRID_DECIMALS = int(os.getenv("ROUTE_GRID_DECIMALS", "3"))
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "1000"))
+ROUTE_SIMPLIFY_METERS = float(os.getenv("ROUTE_SIMPLIFY_METERS", "5"))
+
 
 
 # Password validation
@@ -118,6 +264,10 @@ LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
 
+# Default for StudySpot.time_zone; opening hours are read in the spot's
+# own zone (core/hours.py), never in TIME_ZONE.
+SPOT_TIME_ZONE = os.getenv("SPOT_TIME_ZONE", "Asia/Manila")
+
 USE_I18N = True
 
 USE_TZ = True
@@ -126,12 +276,29 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
-STATIC_VERSION = "v4"
-STATIC_URL = f'/static/{STATIC_VERSION}/'
+STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# collectstatic minifies, content-hashes and precompresses (br + gzip) the
+# assets, and WhiteNoise serves the hashed names as immutable (core/storage.py),
+# so there is no version to bump. The manifest only exists after
+# collectstatic, so it is used when DEBUG is off; override with
+# STATIC_MANIFEST=True/False.
+STATIC_MANIFEST = os.getenv("STATIC_MANIFEST", str(not DEBUG)) == "True"
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "core.storage.MinifiedManifestStaticFilesStorage"
+            if STATIC_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -158,7 +325,29 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For developm
 # EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 # DEFAULT_FROM_EMAIL = 'StudyHive <noreply@studyhive.com>'
 
+# EmailOrUsernameBackend also takes plain usernames; a second backend would
+# repeat the lookup and the password hash on every failed login.
 AUTHENTICATION_BACKENDS = [
-    'core.auth_backends.EmailOrUsernameBackend',  
-    'django.contrib.auth.backends.ModelBackend',
+    'core.auth_backends.EmailOrUsernameBackend',
 ]
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core": {"handlers": ["console"], "level": os.getenv("LOG_LEVEL", "INFO")},
+        # Per-request lines are DEBUG; slow requests still come through
+        "core.requests": {"level": os.getenv("REQUEST_LOG_LEVEL", "INFO")},
+    },
+}
+
+if sys.argv[1:2] == ["test"]:
+    # Keep the test output to failures; assertLogs still sees every record
+    LOGGING["loggers"]["core.requests"]["level"] = "ERROR"
+    # A second connection to the test database, so the router tests can run
+    # real queries against a "replica". It is not in REPLICA_DATABASES, so
+    # other tests never read from it.
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
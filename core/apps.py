@@ -1,4 +1,9 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class CoreConfig(AppConfig):
@@ -6,4 +11,20 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
-            import core.signals  
\ No newline at end of file
+            import core.signals  
+            log_database_settings()
+
+
+def log_database_settings():
+    db = settings.DATABASES["default"]
+    pool = db.get("OPTIONS", {}).get("pool")
+    if pool:
+        logger.info(
+            "Database connection pool enabled: %s (health checks: %s)",
+            pool, db.get("CONN_HEALTH_CHECKS"),
+        )
+    else:
+        logger.info(
+            "Database connection pool disabled; CONN_MAX_AGE=%s (health checks: %s)",
+            db.get("CONN_MAX_AGE"), db.get("CONN_HEALTH_CHECKS"),
+        )
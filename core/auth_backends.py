@@ -1,5 +1,7 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
@@ -7,19 +9,45 @@ class EmailOrUsernameBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
             username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
 
-        # Try matching email
-        try:
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
-            # If email doesn't match, try username
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                return None
+        login = username.strip().lower()
+
+        # One query for both email and username, served by the Lower()
+        # indexes from migration 0023. If several accounts match, prefer the
+        # exact username, then a case-insensitive username, then the oldest
+        # account with that email.
+        user = (
+            User.objects.annotate(email_lower=Lower("email"), username_lower=Lower("username"))
+            .filter(Q(email_lower=login) | Q(username_lower=login))
+            .order_by(
+                Case(
+                    When(username=username, then=Value(0)),
+                    When(username_lower=login, then=Value(1)),
+                    default=Value(2),
+                ),
+                "pk",
+            )
+            .first()
+        )
+
+        if user is None:
+            # Hash anyway so a missing account takes as long as a wrong password
+            User().set_password(password)
+            return None
 
         # Check password
-        if user.check_password(password):
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
 
         return None
+
+    def get_user(self, user_id):
+        # Fetch the profile in the same query; request.profile and every
+        # template's user.userprofile then reuse it.
+        try:
+            user = User._default_manager.select_related("userprofile").get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
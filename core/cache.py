@@ -0,0 +1,71 @@
+"""
+Versioned cache keys for rendered pages and template fragments.
+
+Each cached entry embeds the version of the data it was built from. The
+signal handlers in core/signals.py bump those versions whenever a
+StudySpot, Review or CheckIn changes, so stale entries are simply never
+read again and age out of the backend on their own.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+
+LANDING_NAMESPACE = "landing"
+
+
+def _version_key(namespace):
+    return f"cache-version:{namespace}"
+
+
+def _fresh_version():
+    # Millisecond timestamp instead of 1 so a version key that was evicted
+    # never restarts at a number an old entry is still stored under.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    """Return the current version number for a cache namespace."""
+    return cache.get_or_set(_version_key(namespace), _fresh_version, timeout=None)
+
+
+def bump_version(namespace):
+    """Invalidate every entry built under the namespace's current version."""
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _fresh_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def spot_namespace(spot_id):
+    return f"spot:{spot_id}"
+
+
+def landing_cache_key(query, filter_by, sort_by):
+    """Cache key for one anonymous landing page (q, filter, sort) combination."""
+    params = "\x1f".join([query, filter_by, sort_by])
+    digest = hashlib.md5(params.encode("utf-8")).hexdigest()
+    return f"landing:{get_version(LANDING_NAMESPACE)}:{digest}"
+
+
+def attach_cache_versions(spots):
+    """
+    Evaluate a StudySpot queryset and set ``cache_version`` on every spot,
+    fetching all versions with one get_many() instead of one get() per card.
+    """
+    spots = list(spots)
+    keys = {spot.pk: _version_key(spot_namespace(spot.pk)) for spot in spots}
+    versions = cache.get_many(keys.values())
+
+    missing = {key: _fresh_version() for key in keys.values() if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+
+    for spot in spots:
+        spot.cache_version = versions[keys[spot.pk]]
+    return spots
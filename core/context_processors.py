@@ -0,0 +1,3 @@
+def profile(request):
+    """Expose the request's lazily loaded UserProfile as `profile`."""
+    return {"profile": getattr(request, "profile", None)}
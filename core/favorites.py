@@ -0,0 +1,70 @@
+"""
+Favorite study spots.
+
+List pages never ask "is this one favorited?" per card. They read the
+user's favorite spot ids once per request, either from a per-user cache
+entry (`favorite_ids`) or with one IN query over the visible spots
+(`favorited_among`). The Favorite signal handlers in core/signals.py keep
+that cache entry and StudySpot.favorite_count in step with the rows.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Favorite, StudySpot
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def cache_key(user_id):
+    return f"favorites:{user_id}"
+
+
+def favorite_ids(user):
+    """Set of spot ids the user has favorited; cached per user."""
+    if not user.is_authenticated:
+        return set()
+    key = cache_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = set(Favorite.objects.filter(user=user).values_list("spot_id", flat=True))
+        cache.set(key, ids, CACHE_TIMEOUT)
+    return ids
+
+
+def favorited_among(user, spot_ids):
+    """The subset of `spot_ids` the user has favorited, with one IN query."""
+    if not user.is_authenticated:
+        return set()
+    return set(
+        Favorite.objects.filter(user=user, spot_id__in=spot_ids).values_list("spot_id", flat=True)
+    )
+
+
+def add_favorite(user, spot):
+    """Favorite `spot` for `user`. Returns False if it already was."""
+    with transaction.atomic():
+        _, created = Favorite.objects.get_or_create(user=user, spot=spot)
+    return created
+
+
+def remove_favorite(user, spot):
+    """Unfavorite `spot`. Returns False if it was not a favorite."""
+    # QuerySet.delete() still sends post_delete for each row it removes
+    deleted, _ = Favorite.objects.filter(user=user, spot=spot).delete()
+    return bool(deleted)
+
+
+def recount():
+    """Recompute every StudySpot.favorite_count from the Favorite table. Returns rows fixed."""
+    counts = (
+        Favorite.objects.filter(spot=OuterRef("pk"))
+        .order_by().values("spot").annotate(n=Count("pk")).values("n")
+    )
+    return (
+        StudySpot.objects.annotate(actual=Coalesce(Subquery(counts), 0))
+        .exclude(favorite_count=F("actual"))
+        .update(favorite_count=Coalesce(Subquery(counts), 0))
+    )
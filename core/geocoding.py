@@ -0,0 +1,262 @@
+"""
+Forward and reverse geocoding behind a persistent cache.
+
+Every answer, including "not found", is stored in GeocodeCacheEntry under a
+normalized key, so an address is only sent to the provider once per
+GEOCODE_CACHE_DAYS (GEOCODE_MISS_DAYS for misses). `geocode_many` resolves a
+batch with one cache query and one provider call per distinct unknown
+address.
+
+Providers are slow and rate limited (Nominatim allows one request per
+second), so web requests only read the table (cached_only=True); new
+addresses are looked up by `manage.py backfill_coordinates`.
+
+The provider is pluggable through the GEOCODER setting:
+NominatimGeocoder talks to an OSM Nominatim server (GEOCODER_URL), and
+GazetteerGeocoder answers offline from core/data/gazetteer.json for tests
+and local development.
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import GeocodeCacheEntry
+
+logger = logging.getLogger(__name__)
+
+REVERSE_PRECISION = 4  # ~11 m
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "gazetteer.json"
+
+
+class Location(NamedTuple):
+    lat: float
+    lng: float
+    address: str = ""
+
+
+def parse_coordinates(lat, lng):
+    """(lat, lng) as floats if both are present and in range, else None."""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(lat) and math.isfinite(lng)):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def normalize_address(address):
+    address = unicodedata.normalize("NFKD", address).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", " ", address.lower()).strip()
+
+
+# ---------- PROVIDERS ----------
+
+class Geocoder(ABC):
+    name = "base"
+
+    @abstractmethod
+    def forward(self, address):
+        """Return a Location for `address`, or None if it cannot be found."""
+
+    @abstractmethod
+    def reverse(self, lat, lng):
+        """Return a Location with a display address for the point, or None."""
+
+
+class NominatimGeocoder(Geocoder):
+    """OSM Nominatim. Sends at most one request per second, per its usage policy."""
+
+    name = "nominatim"
+    min_interval = 1.0
+
+    def __init__(self):
+        self.client = httpx.Client(
+            base_url=settings.GEOCODER_URL,
+            timeout=settings.GEOCODER_TIMEOUT,
+            headers={"User-Agent": settings.GEOCODER_USER_AGENT},
+        )
+        self._lock = threading.Lock()
+        self._last_request = 0.0
+
+    def _get(self, path, params):
+        with self._lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+        response = self.client.get(path, params={**params, "format": "jsonv2"})
+        response.raise_for_status()
+        return response.json()
+
+    def forward(self, address):
+        results = self._get("/search", {"q": address, "limit": 1, "countrycodes": settings.GEOCODER_COUNTRIES})
+        if not results:
+            return None
+        return Location(float(results[0]["lat"]), float(results[0]["lon"]), results[0].get("display_name", ""))
+
+    def reverse(self, lat, lng):
+        result = self._get("/reverse", {"lat": lat, "lon": lng})
+        if not result or "error" in result:
+            return None
+        return Location(float(result["lat"]), float(result["lon"]), result.get("display_name", ""))
+
+
+class GazetteerGeocoder(Geocoder):
+    """Offline stand-in: matches place names from core/data/gazetteer.json."""
+
+    name = "gazetteer"
+
+    def __init__(self, path=GAZETTEER_PATH):
+        with open(path, encoding="utf-8") as f:
+            self.places = json.load(f)
+        # Longest names first, so "Cebu IT Park" wins over "Cebu"
+        self.names = sorted(
+            (
+                (normalize_address(name), place)
+                for place in self.places
+                for name in [place["name"], *place.get("aliases", [])]
+            ),
+            key=lambda item: -len(item[0]),
+        )
+
+    def forward(self, address):
+        text = f" {normalize_address(address)} "
+        for name, place in self.names:
+            if f" {name} " in text:
+                return Location(place["lat"], place["lng"], place["name"])
+        return None
+
+    def reverse(self, lat, lng):
+        place = min(self.places, key=lambda p: (p["lat"] - lat) ** 2 + (p["lng"] - lng) ** 2)
+        return Location(lat, lng, place["name"])
+
+
+@lru_cache(maxsize=None)
+def _load_geocoder(path):
+    return import_string(path)()
+
+
+def get_geocoder():
+    return _load_geocoder(settings.GEOCODER)
+
+
+# ---------- CACHED LOOKUPS ----------
+
+def _forward_key(address):
+    return f"fwd:{normalize_address(address)}"[:255]
+
+
+def _reverse_key(lat, lng):
+    return f"rev:{round(lat, REVERSE_PRECISION)},{round(lng, REVERSE_PRECISION)}"
+
+
+def _fresh(entry, now):
+    days = settings.GEOCODE_CACHE_DAYS if entry.lat is not None else settings.GEOCODE_MISS_DAYS
+    return entry.updated_at >= now - timedelta(days=days)
+
+
+def _store(entries):
+    GeocodeCacheEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["lat", "lng", "address", "provider", "updated_at"],
+    )
+
+
+def geocode_many(addresses, cached_only=False):
+    """
+    Resolve addresses to Locations. Returns {address: Location or None}
+    with one entry per distinct input address. With cached_only, addresses
+    not in the table are left as None instead of asking the provider.
+    """
+    geocoder = get_geocoder()
+    keys = {}
+    for address in addresses:
+        if address and normalize_address(address):
+            keys.setdefault(_forward_key(address), []).append(address)
+
+    now = timezone.now()
+    cached = {
+        entry.key: entry
+        for entry in GeocodeCacheEntry.objects.filter(key__in=keys)
+        if _fresh(entry, now)
+    }
+
+    results = {address: None for address in addresses}
+    misses = []
+    for key, same_addresses in keys.items():
+        entry = cached.get(key)
+        if entry is None:
+            if cached_only:
+                continue
+            try:
+                location = geocoder.forward(same_addresses[0])
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                # Provider trouble is not a "not found"; don't cache it
+                logger.warning("Geocoding %r failed: %s", same_addresses[0], e)
+                continue
+            entry = GeocodeCacheEntry(
+                key=key,
+                lat=location.lat if location else None,
+                lng=location.lng if location else None,
+                address=(location.address if location else "")[:500],
+                provider=geocoder.name,
+                updated_at=now,
+            )
+            misses.append(entry)
+        if entry.lat is not None:
+            for address in same_addresses:
+                results[address] = Location(entry.lat, entry.lng, entry.address)
+
+    if misses:
+        _store(misses)
+    return results
+
+
+def geocode(address, cached_only=False):
+    """Location for one address, or None."""
+    return geocode_many([address], cached_only).get(address)
+
+
+def reverse_geocode(lat, lng):
+    """Location with a display address for the point, or None."""
+    key = _reverse_key(lat, lng)
+    entry = GeocodeCacheEntry.objects.filter(key=key).first()
+    if entry is None or not _fresh(entry, timezone.now()):
+        geocoder = get_geocoder()
+        try:
+            location = geocoder.reverse(lat, lng)
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.warning("Reverse geocoding %s,%s failed: %s", lat, lng, e)
+            return None
+        entry = GeocodeCacheEntry(
+            key=key,
+            lat=location.lat if location else None,
+            lng=location.lng if location else None,
+            address=(location.address if location else "")[:500],
+            provider=geocoder.name,
+            updated_at=timezone.now(),
+        )
+        _store([entry])
+    if entry.lat is None:
+        return None
+    return Location(entry.lat, entry.lng, entry.address)
@@ -0,0 +1,260 @@
+"""
+Opening hours: is a spot open at a given moment, and when does that change.
+
+A spot's hours on a local date come from the first of these that applies:
+
+1. SpecialHours rows for that date (holidays; a row without times = closed),
+2. open_24_7,
+3. OpeningHours rows for that weekday (a row without times = closed),
+4. its everyday opening_time/closing_time, where a missing opening time
+   means midnight and a missing closing time means until midnight.
+
+An interval that closes at or before it opens runs past midnight into the
+next day. Everything is read in the spot's own time_zone, not TIME_ZONE.
+
+The rules are written twice, once per side of the database: `annotate_open`
+turns them into SQL so "open now" filters and sorts run in the query, and
+`statuses` evaluates them in Python to find each spot's next opening or
+closing, which `refresh` stores in the indexed
+StudySpot.next_status_change_at.
+
+Requests only read. `manage.py refresh_opening_hours`, run every minute,
+keeps next_status_change_at current; "open now" itself never depends on
+it. With AUTO_CHECKOUT_ON_CLOSE on, it also checks everyone out of spots
+that have closed.
+"""
+
+import math
+import zoneinfo
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import BooleanField, Exists, ExpressionWrapper, F, Min, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import metrics
+from .cache import LANDING_NAMESPACE, bump_version, spot_namespace
+from .models import CheckIn, OpeningHours, SpecialHours, StudySpot
+
+MIDNIGHT = time(0)
+# How far ahead the next change is looked for. A spot that neither opens
+# nor closes within a week (24/7, or closed for good) is re-checked then.
+LOOKAHEAD_DAYS = 7
+BATCH_SIZE = 500
+
+HOURS_FIELDS = ["open_24_7", "opening_time", "closing_time", "time_zone", "next_status_change_at"]
+
+
+# ---------- SQL ----------
+
+def _interval(t, opens, closes, carried_over=False):
+    """
+    Lookup for intervals that are open at local time `t` on the day they
+    start or, with `carried_over`, on the day after (past midnight).
+    """
+    if carried_over:
+        return Q(**{f"{closes}__lte": F(opens), f"{closes}__gt": t})
+    return Q(**{f"{opens}__lte": t}) & (Q(**{f"{closes}__lte": F(opens)}) | Q(**{f"{closes}__gt": t}))
+
+
+def _open_on(day, t, carried_over):
+    """Spots open at local time `t` thanks to hours that start on local date `day`."""
+    special = SpecialHours.objects.filter(spot=OuterRef("pk"), date=day)
+    weekly = OpeningHours.objects.filter(spot=OuterRef("pk"), weekday=day.weekday())
+    regular = (
+        Exists(weekly.filter(_interval(t, "opens", "closes", carried_over)))
+        | (~Exists(weekly) & _interval(t, "_opens", "_closes", carried_over))
+    )
+    if carried_over:
+        # 24/7 hours are a full day and never carry over; weekly rows of a
+        # 24/7 spot are ignored
+        usual = Q(open_24_7=False) & regular
+    else:
+        usual = Q(open_24_7=True) | regular
+    return Exists(special.filter(_interval(t, "opens", "closes", carried_over))) | (~Exists(special) & usual)
+
+
+def open_at_q(when, time_zones):
+    """Q for spots open at the aware datetime `when`, given the time zones in use."""
+    q = Q()
+    for name in time_zones:
+        local = timezone.localtime(when, zoneinfo.ZoneInfo(name))
+        day, t = local.date(), local.time().replace(microsecond=0)
+        q |= Q(time_zone=name) & (_open_on(day, t, False) | _open_on(day - timedelta(days=1), t, True))
+    return q
+
+
+def annotate_open(queryset, when=None):
+    """Annotate a StudySpot queryset with `is_open` at `when` (default: now)."""
+    when = when or timezone.now()
+    time_zones = StudySpot.objects.order_by().values_list("time_zone", flat=True).distinct()
+    q = open_at_q(when, time_zones)
+    return queryset.alias(
+        _opens=Coalesce("opening_time", Value(MIDNIGHT)),
+        _closes=Coalesce("closing_time", Value(MIDNIGHT)),
+    ).annotate(is_open=ExpressionWrapper(q, output_field=BooleanField()) if q else Value(False))
+
+
+# ---------- PYTHON ----------
+
+def _hours(spot_ids, first_day, last_day):
+    """
+    Weekly and special intervals of the spots as
+    {spot_id: {weekday or date: [(opens, closes), ...]}}.
+    """
+    weekly, special = {}, {}
+    rows = OpeningHours.objects.filter(spot_id__in=spot_ids).values_list("spot_id", "weekday", "opens", "closes")
+    for spot_id, weekday, opens, closes in rows:
+        intervals = weekly.setdefault(spot_id, {}).setdefault(weekday, [])
+        if opens is not None:
+            intervals.append((opens, closes))
+    rows = SpecialHours.objects.filter(
+        spot_id__in=spot_ids, date__range=(first_day, last_day),
+    ).values_list("spot_id", "date", "opens", "closes")
+    for spot_id, date, opens, closes in rows:
+        intervals = special.setdefault(spot_id, {}).setdefault(date, [])
+        if opens is not None:
+            intervals.append((opens, closes))
+    return weekly, special
+
+
+def _intervals(spot, day, weekly, special):
+    if day in special:
+        return special[day]
+    if spot.open_24_7:
+        return [(MIDNIGHT, MIDNIGHT)]
+    if day.weekday() in weekly:
+        return weekly[day.weekday()]
+    return [(spot.opening_time or MIDNIGHT, spot.closing_time or MIDNIGHT)]
+
+
+def _periods(spot, first_day, last_day, weekly, special):
+    """Merged (start, end) UTC datetimes of the spot's opening periods starting in the date range."""
+    tz = zoneinfo.ZoneInfo(spot.time_zone)
+    periods = []
+    day = first_day
+    while day <= last_day:
+        for opens, closes in _intervals(spot, day, weekly, special):
+            end_day = day + timedelta(days=1) if closes <= opens else day
+            periods.append((
+                datetime.combine(day, opens, tz).astimezone(dt_timezone.utc),
+                datetime.combine(end_day, closes, tz).astimezone(dt_timezone.utc),
+            ))
+        day += timedelta(days=1)
+
+    merged = []
+    for start, end in sorted(periods):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _status(spot, when, weekly, special):
+    tz = zoneinfo.ZoneInfo(spot.time_zone)
+    today = timezone.localtime(when, tz).date()
+    last_day = today + timedelta(days=LOOKAHEAD_DAYS)
+    for start, end in _periods(spot, today - timedelta(days=1), last_day, weekly, special):
+        if end <= when:
+            continue
+        if start <= when:
+            return True, end
+        return False, start
+    return False, datetime.combine(last_day + timedelta(days=1), MIDNIGHT, tz).astimezone(dt_timezone.utc)
+
+
+def statuses(spots, when=None):
+    """
+    {spot.pk: (is_open, next_change)} at `when` (default: now) for StudySpot
+    instances, with two queries however many spots there are.
+    """
+    when = when or timezone.now()
+    spots = list(spots)
+    # A local date is at most a day away from the UTC one
+    today = when.astimezone(dt_timezone.utc).date()
+    weekly, special = _hours(
+        [spot.pk for spot in spots],
+        today - timedelta(days=2),
+        today + timedelta(days=LOOKAHEAD_DAYS + 1),
+    )
+    return {
+        spot.pk: _status(spot, when, weekly.get(spot.pk, {}), special.get(spot.pk, {}))
+        for spot in spots
+    }
+
+
+def status_at(spot, when=None):
+    """(is_open, next_change) for one spot."""
+    return statuses([spot], when)[spot.pk]
+
+
+# ---------- MAINTENANCE ----------
+
+def refresh(spots, when=None):
+    """
+    Recompute and save next_status_change_at for the spots (a queryset or
+    instances). It is derived data, so `version` is not bumped. Returns the
+    statuses() result.
+    """
+    when = when or timezone.now()
+    spots = list(spots)
+    results = {}
+    for i in range(0, len(spots), BATCH_SIZE):
+        batch = spots[i:i + BATCH_SIZE]
+        results.update(statuses(batch, when))
+        for spot in batch:
+            spot.next_status_change_at = results[spot.pk][1]
+        StudySpot.objects.bulk_update(batch, ["next_status_change_at"])
+    return results
+
+
+def refresh_due(when=None):
+    """
+    Refresh every spot whose next change has come and, with
+    AUTO_CHECKOUT_ON_CLOSE on, check everyone out of the spots that are now
+    closed. Returns (refreshed, checked_out).
+    """
+    when = when or timezone.now()
+    due = StudySpot.objects.filter(
+        Q(next_status_change_at__lte=when) | Q(next_status_change_at__isnull=True)
+    ).only(*HOURS_FIELDS)
+    results = refresh(due, when)
+    if not settings.AUTO_CHECKOUT_ON_CLOSE:
+        return len(results), 0
+    closed = [pk for pk, (is_open, _) in results.items() if not is_open]
+    return len(results), check_out(closed)
+
+
+def check_out(spot_ids):
+    """
+    End the active check-ins at the spots the way the check-in toggle does,
+    one save() each, so signals, versions and metrics stay in step.
+    Returns how many ended.
+    """
+    if not spot_ids:
+        return 0
+    checkins = list(CheckIn.objects.filter(spot_id__in=spot_ids, is_active=True))
+    for checkin in checkins:
+        checkin.check_out()
+        metrics.CHECKIN_TOGGLES.labels("closing").inc()
+    return len(checkins)
+
+
+def seconds_until_next_change(when=None):
+    """Seconds until any spot opens or closes, or None if nothing is scheduled."""
+    when = when or timezone.now()
+    next_change = StudySpot.objects.filter(next_status_change_at__gt=when).aggregate(
+        next_change=Min("next_status_change_at"),
+    )["next_change"]
+    if next_change is None:
+        return None
+    return max(1, math.ceil((next_change - when).total_seconds()))
+
+
+def hours_changed(spot_id):
+    """After an OpeningHours/SpecialHours change: recompute the spot and drop its cached pages."""
+    refresh(StudySpot.objects.filter(pk=spot_id).only(*HOURS_FIELDS))
+    bump_version(LANDING_NAMESPACE)
+    bump_version(spot_namespace(spot_id))
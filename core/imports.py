@@ -0,0 +1,175 @@
+"""
+Bulk import of study spots from CSV or GeoJSON.
+
+Rows are validated with the StudySpotForm rules (plus coordinates and
+opening hours), deduplicated against each other and the existing table on
+normalized name + coordinates, and inserted with bulk_create in batches.
+bulk_create skips signals, so the derived data they would have maintained
+(site statistics, cached landing pages, next opening/closing times) is
+refreshed explicitly.
+
+Used by `manage.py import_spots` and the "Import spots" page in the admin.
+"""
+
+import csv
+import io
+import json
+import re
+import unicodedata
+
+from django import forms
+from django.db import transaction
+
+from . import hours, stats
+from .cache import LANDING_NAMESPACE, bump_version
+from .forms import StudySpotForm
+from .models import StudySpot
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+# ~11 m: the same place geocoded by two sources still matches
+COORDINATE_PRECISION = 4
+
+BOOLEAN_FIELDS = ["wifi", "ac", "free", "coffee", "open_24_7", "outlets", "pastries", "is_trending"]
+TRUE_VALUES = {"1", "true", "yes", "y", "on", "t"}
+
+
+class SpotImportForm(StudySpotForm):
+    lat = forms.FloatField(required=False, min_value=-90, max_value=90)
+    lng = forms.FloatField(required=False, min_value=-180, max_value=180)
+
+    class Meta(StudySpotForm.Meta):
+        fields = StudySpotForm.Meta.fields + ["opening_time", "closing_time", "lat", "lng"]
+
+    def clean(self):
+        cleaned = super().clean()
+        if (cleaned.get("lat") is None) != (cleaned.get("lng") is None):
+            raise forms.ValidationError("lat and lng must be given together.")
+        if cleaned.get("open_24_7"):
+            cleaned["opening_time"] = cleaned["closing_time"] = None
+        return cleaned
+
+
+# ---------- READERS ----------
+
+def read_csv(fileobj):
+    """
+    Yield one dict per row of a binary CSV file, header names lowercased.
+    A file that is not valid UTF-8 CSV raises ValueError.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        for row in reader:
+            if None in row:
+                raise ValueError(f"line {reader.line_num} has more fields than the header")
+            yield {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+    except csv.Error as e:
+        raise ValueError(f"line {reader.line_num}: {e}") from e
+
+
+def read_geojson(fileobj):
+    """
+    Yield one dict per Point feature: its properties plus lat/lng. A file
+    that is not a GeoJSON FeatureCollection raises ValueError.
+    """
+    document = json.load(fileobj)
+    features = document.get("features", []) if isinstance(document, dict) else None
+    if not isinstance(features, list):
+        raise ValueError("not a GeoJSON FeatureCollection")
+    for number, feature in enumerate(features, start=1):
+        try:
+            row = {key.lower(): value for key, value in (feature.get("properties") or {}).items()}
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Point":
+                row["lng"], row["lat"] = geometry["coordinates"][:2]
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"feature {number} is not a valid GeoJSON feature") from e
+        yield row
+
+
+def reader_for(filename):
+    return read_geojson if filename.lower().endswith((".geojson", ".json")) else read_csv
+
+
+# ---------- DEDUPLICATION ----------
+
+def normalize_name(name):
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+def dedupe_key(name, lat, lng, location=""):
+    if lat is None or lng is None:
+        # No coordinates: fall back to the written address
+        return (normalize_name(name), normalize_name(location or ""))
+    return (normalize_name(name), round(lat, COORDINATE_PRECISION), round(lng, COORDINATE_PRECISION))
+
+
+def existing_keys():
+    rows = StudySpot.objects.values_list("name", "lat", "lng", "location").iterator(chunk_size=5000)
+    return {dedupe_key(*row) for row in rows}
+
+
+# ---------- IMPORT ----------
+
+def _form_data(row):
+    data = {key: value for key, value in row.items() if value not in (None, "")}
+    for field in BOOLEAN_FIELDS:
+        value = str(row.get(field, "")).strip().lower()
+        if value in TRUE_VALUES:
+            data[field] = "on"
+        else:
+            data.pop(field, None)
+    return data
+
+
+def import_spots(rows, owner, dry_run=False):
+    """
+    Validate and insert `rows` (dicts from read_csv/read_geojson) as spots
+    owned by `owner`. Returns a report dict: created, duplicates, invalid
+    and the first MAX_REPORTED_ERRORS row errors.
+    """
+    report = {"created": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    seen = existing_keys()
+    batch = []
+
+    with transaction.atomic():
+        for number, row in enumerate(rows, start=1):
+            form = SpotImportForm(_form_data(row))
+            if not form.is_valid():
+                report["invalid"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append({"row": number, "errors": form.errors.get_json_data()})
+                continue
+
+            data = form.cleaned_data
+            key = dedupe_key(data["name"], data["lat"], data["lng"], data["location"])
+            if key in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+
+            spot = form.save(commit=False)
+            spot.owner = owner
+            batch.append(spot)
+            if len(batch) >= BATCH_SIZE:
+                report["created"] += _flush(batch, dry_run)
+
+        report["created"] += _flush(batch, dry_run)
+
+        if report["created"] and not dry_run:
+            # What the StudySpot post_save handlers would have done, once
+            stats.recompute(stats.STUDY_SPOTS)
+            stats.recompute(stats.CITIES)
+            transaction.on_commit(lambda: bump_version(LANDING_NAMESPACE))
+
+    return report
+
+
+def _flush(batch, dry_run):
+    count = len(batch)
+    if count and not dry_run:
+        hours.refresh(StudySpot.objects.bulk_create(batch))
+    batch.clear()
+    return count
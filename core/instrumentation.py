@@ -0,0 +1,212 @@
+"""
+Per-request timing of SQL, template rendering and storage calls.
+
+RequestTimingMiddleware starts a RequestTimings collector for each request.
+Queries on every database alias are counted through
+`connection.execute_wrapper`, templates are timed by TimedDjangoTemplates
+(the TEMPLATES backend) and outbound calls are timed by wrapping them in
+`storage_call()`. The totals go to the request metrics in core/metrics.py
+and one JSON log line per request at DEBUG, and to a Server-Timing header
+when DEBUG or SERVER_TIMING_HEADER is on. Requests slower than
+SLOW_REQUEST_MS log at WARNING with their SLOW_QUERY_COUNT slowest queries
+and the line of our code that ran them.
+
+Only the slowest queries seen so far keep their SQL and call site, so the
+cost per query is a clock read and a heap comparison.
+"""
+
+import heapq
+import json
+import logging
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+from django.urls import Resolver404, resolve
+
+from . import metrics
+
+logger = logging.getLogger("core.requests")
+
+_current = ContextVar("request_timings", default=None)
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+SKIP_PATHS = ("site-packages", str(Path(__file__).resolve()))
+
+
+class RequestTimings:
+    def __init__(self, slow_query_count):
+        self.started = time.perf_counter()
+        self.durations = {"db": 0.0, "template": 0.0, "storage": 0.0}
+        self.counts = {"db": 0, "template": 0, "storage": 0}
+        self.slow_query_count = slow_query_count
+        self._slowest = []  # min-heap of (ms, seq, sql, origin)
+
+    def add(self, kind, ms):
+        self.durations[kind] += ms
+        self.counts[kind] += 1
+
+    def add_query(self, ms, sql):
+        self.add("db", ms)
+        if not self.slow_query_count:
+            return
+        entry = (ms, self.counts["db"], sql)
+        if len(self._slowest) < self.slow_query_count:
+            heapq.heappush(self._slowest, entry + (query_origin(),))
+        elif ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry + (query_origin(),))
+
+    def slowest_queries(self):
+        return [
+            {"ms": round(ms, 2), "sql": sql, "origin": origin}
+            for ms, _, sql, origin in sorted(self._slowest, reverse=True)
+        ]
+
+    def elapsed(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def query_origin():
+    """`path:line in function` of the innermost project frame outside Django."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_ROOT) and not any(p in filename for p in SKIP_PATHS):
+            return f"{Path(filename).relative_to(PROJECT_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+@contextmanager
+def timed(kind):
+    """Add the duration of the block to the current request's `kind` total."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(kind, (time.perf_counter() - start) * 1000)
+
+
+@contextmanager
+def storage_call(operation):
+    """Time a Supabase Storage call for the request and the storage metrics."""
+    start = time.perf_counter()
+    try:
+        with timed("storage"):
+            yield
+    except Exception:
+        metrics.STORAGE_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        metrics.STORAGE_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query((time.perf_counter() - start) * 1000, sql)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed("template"):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that reports render time to RequestTimingMiddleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def url_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+    return match.view_name
+
+
+class RequestTimingMiddleware:
+    """
+    Collects RequestTimings for each request and reports them. Place it
+    first in MIDDLEWARE so the total covers the other middleware too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_TIMING_ENABLED:
+            return self.get_response(request)
+
+        timings = RequestTimings(settings.SLOW_QUERY_COUNT)
+        token = _current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(_time_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = timings.elapsed()
+        # Query counts and timings are for developers, not every client
+        if settings.DEBUG or settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={timings.durations["db"]:.1f};desc="{timings.counts["db"]} queries"',
+                    f'tpl;dur={timings.durations["template"]:.1f}',
+                    f'storage;dur={timings.durations["storage"]:.1f}',
+                    f"total;dur={total:.1f}",
+                ]
+            )
+        metrics.observe_request(
+            url_name(request), request.method, total / 1000,
+            timings.counts["db"], timings.durations["db"] / 1000,
+        )
+        self.log(request, response, timings, total)
+        return response
+
+    def log(self, request, response, timings, total):
+        slow = total >= settings.SLOW_REQUEST_MS
+        if not slow and not logger.isEnabledFor(logging.DEBUG):
+            return
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": url_name(request),
+            "status": response.status_code,
+            "duration_ms": round(total, 1),
+            "db_queries": timings.counts["db"],
+            "db_ms": round(timings.durations["db"], 1),
+            "template_ms": round(timings.durations["template"], 1),
+            "storage_calls": timings.counts["storage"],
+            "storage_ms": round(timings.durations["storage"], 1),
+        }
+        if slow:
+            record["slow_queries"] = timings.slowest_queries()
+            logger.warning(json.dumps(record))
+        else:
+            logger.debug(json.dumps(record))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.cache import LANDING_NAMESPACE, bump_version
+from core.geocoding import geocode_many
+from core.models import StudySpot
+
+
+class Command(BaseCommand):
+    help = (
+        "Geocode the location of every study spot without coordinates so it "
+        "shows on the map. Each distinct address is looked up once (and "
+        "cached), however many spots share it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Distinct addresses per batch.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        missing = StudySpot.objects.filter(Q(lat__isnull=True) | Q(lng__isnull=True))
+        addresses = sorted(set(missing.exclude(location="").values_list("location", flat=True)))
+        self.stdout.write(f"{missing.count()} spots without coordinates, {len(addresses)} distinct addresses.")
+
+        updated = unresolved = 0
+        size = options["batch_size"]
+        for start in range(0, len(addresses), size):
+            found = geocode_many(addresses[start:start + size])
+            spots = list(missing.filter(location__in=found))
+            for spot in spots:
+                location = found[spot.location]
+                if location:
+                    spot.lat, spot.lng = location.lat, location.lng
+            resolved = [spot for spot in spots if found[spot.location]]
+            unresolved += len(spots) - len(resolved)
+            if resolved and not options["dry_run"]:
+                # bulk_update skips save(), so bump what TrackedModel.save() would
+                now = timezone.now()
+                for spot in resolved:
+                    spot.version = F("version") + 1
+                    spot.updated_at = now
+                StudySpot.objects.bulk_update(resolved, ["lat", "lng", "version", "updated_at"], batch_size=500)
+            updated += len(resolved)
+            self.stdout.write(f"  {min(start + size, len(addresses))}/{len(addresses)} addresses")
+
+        if updated and not options["dry_run"]:
+            bump_version(LANDING_NAMESPACE)
+        verb = "Would update" if options["dry_run"] else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {updated} spots; {unresolved} addresses could not be found."))
@@ -0,0 +1,87 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine
+from django.template.backends.django import get_installed_libraries
+from django.utils import timezone
+
+from core.models import StudySpot
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare landing page card rendering with and without the cached "
+        "template loader and per-spot {% cache %} fragments. Uses in-memory "
+        "spots, so no database rows are needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cards", type=int, default=500)
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        spots = [self.fake_spot(i) for i in range(1, options["cards"] + 1)]
+        rounds = options["rounds"]
+
+        plain_loaders = [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ]
+        engine_kwargs = {
+            "dirs": settings.TEMPLATES[0]["DIRS"],
+            "libraries": get_installed_libraries(),
+        }
+        plain = Engine(loaders=plain_loaders, **engine_kwargs)
+        cached = Engine(
+            loaders=[("django.template.loaders.cached.Loader", plain_loaders)],
+            **engine_kwargs,
+        )
+
+        # A zero timeout makes {% cache %} render its body every time, which
+        # is what the page cost before fragments were cached.
+        uncached_ctx = {"study_spaces": spots, "cache_ttl": 0, "study_spot_count": len(spots)}
+        cached_ctx = dict(uncached_ctx, cache_ttl=settings.CACHE_TTL)
+
+        cache.clear()
+        results = [
+            ("plain loader, no fragment cache", self.time_render(plain, uncached_ctx, rounds)),
+            ("cached loader, no fragment cache", self.time_render(cached, uncached_ctx, rounds)),
+            ("cached loader, warm fragment cache", self.time_render(cached, cached_ctx, rounds)),
+        ]
+
+        baseline = results[0][1]
+        self.stdout.write(f"landing.html with {len(spots)} cards, {rounds} rounds (median ms/render)")
+        for label, ms in results:
+            self.stdout.write(f"  {label:<36} {ms:8.2f} ms  ({baseline / ms:4.1f}x)")
+
+    def time_render(self, engine, context, rounds):
+        # One untimed render loads the template and warms the fragment cache
+        engine.get_template("landing.html").render(Context(context))
+
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            engine.get_template("landing.html").render(Context(context))
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    def fake_spot(self, i):
+        return StudySpot(
+            id=i,
+            name=f"Study Spot {i}",
+            location=f"{i} Osmeña Blvd, Cebu City",
+            description="Quiet tables, strong Wi-Fi and plenty of outlets near campus. " * 3,
+            wifi=i % 2 == 0,
+            ac=i % 3 == 0,
+            coffee=i % 4 == 0,
+            outlets=True,
+            pastries=i % 5 == 0,
+            open_24_7=i % 7 == 0,
+            is_trending=i % 10 == 0,
+            average_rating=round(1 + (i % 40) / 10, 2),
+            images=[f"https://example.com/spots/{i}/{n}.jpg" for n in range(i % 4)],
+            updated_at=timezone.now(),
+        )
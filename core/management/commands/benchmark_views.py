@@ -0,0 +1,182 @@
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import StudySpot
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+
+def percentile(samples, pct):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database at each size and time the hot views "
+        "through the test client: query count, p50/p95 latency and peak "
+        "Python memory per request. Writes a JSON report that can be "
+        "compared against one from another commit with --compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Numbers of study spots to seed.")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Keep the cache between requests (steady state) instead of clearing it before each one.",
+        )
+        parser.add_argument("--output", default="benchmark-report.json")
+        parser.add_argument("--compare", help="A previous report to print the differences against.")
+
+    def handle(self, *args, **options):
+        report = {
+            "commit": self.current_commit(),
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "warm_cache": options["warm_cache"],
+            "results": {},
+        }
+
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        runner.setup_test_environment()
+        try:
+            for size in options["sizes"]:
+                self.stdout.write(f"Seeding {size} spots...")
+                old_config = runner.setup_databases()
+                try:
+                    call_command("seed_data", spots=size, seed=options["seed"], verbosity=0)
+                    with override_settings(RATELIMIT_ENABLED=False):
+                        report["results"][str(size)] = self.run_size(options)
+                finally:
+                    runner.teardown_databases(old_config)
+                    cache.clear()
+        finally:
+            runner.teardown_test_environment()
+
+        Path(options["output"]).write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        if options["compare"]:
+            self.compare(json.loads(Path(options["compare"]).read_text()), report)
+
+    def current_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def run_size(self, options):
+        user = User.objects.create_user("benchmark", "benchmark@example.com", "benchmark")
+        anonymous = Client()
+        client = Client()
+        client.force_login(user)
+
+        # Worst case for the detail page: the most reviewed spot
+        busiest = StudySpot.objects.annotate(n=Count("reviews")).order_by("-n").first()
+        always_open = StudySpot.objects.filter(open_24_7=True).first() or busiest
+        # A different spot per review so each POST creates a review
+        review_targets = iter(
+            StudySpot.objects.order_by("pk").values_list("pk", flat=True)[: options["warmup"] + options["iterations"] + 1]
+        )
+
+        scenarios = {
+            # Logged-in visitors are redirected to home, so the landing page is anonymous
+            "landing_view": lambda: anonymous.get(reverse("core:landing")),
+            "map_view": lambda: client.get(reverse("core:map_view")),
+            "studyspot_detail": lambda: client.get(reverse("core:studyspot_detail", args=[busiest.pk])),
+            "check_in_out_toggle": lambda: client.post(reverse("core:check_in_out_toggle", args=[always_open.pk])),
+            "review_post": lambda: client.post(
+                reverse("core:studyspot_detail", args=[next(review_targets)]),
+                {"rating": 4, "comment": "Benchmark review"},
+            ),
+        }
+
+        results = {}
+        for name, request in scenarios.items():
+            results[name] = self.measure(request, options)
+            r = results[name]
+            self.stdout.write(
+                f"  {name:<20} {r['queries']:>4} queries   p50 {r['p50_ms']:8.2f} ms   "
+                f"p95 {r['p95_ms']:8.2f} ms   peak {r['peak_kib']:9.1f} KiB"
+            )
+        return results
+
+    def measure(self, request, options):
+        for _ in range(options["warmup"]):
+            request()
+
+        # Count with a wrapper rather than CaptureQueriesContext: its log is
+        # capped at 9000 entries, which an N+1 page at 100k spots overflows.
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        samples = []
+        for _ in range(options["iterations"]):
+            if not options["warm_cache"]:
+                cache.clear()
+            queries = 0
+            with connection.execute_wrapper(count_query):
+                start = time.perf_counter()
+                response = request()
+                samples.append((time.perf_counter() - start) * 1000)
+
+        # Memory is measured on a separate request: tracemalloc skews timings
+        if not options["warm_cache"]:
+            cache.clear()
+        tracemalloc.start()
+        try:
+            request()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "status": response.status_code,
+            "queries": queries,
+            "p50_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+    def compare(self, previous, current):
+        self.stdout.write(f"\nChanges since {previous.get('commit') or 'previous report'}:")
+        for size, views in current["results"].items():
+            for name, now in views.items():
+                before = previous.get("results", {}).get(size, {}).get(name)
+                if before is None:
+                    continue
+                self.stdout.write(
+                    f"  {size:>6} {name:<20} queries {now['queries'] - before['queries']:+d}   "
+                    f"p95 {now['p95_ms'] - before['p95_ms']:+8.2f} ms   "
+                    f"peak {now['peak_kib'] - before['peak_kib']:+9.1f} KiB"
+                )
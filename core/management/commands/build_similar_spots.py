@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import similarity
+
+
+class Command(BaseCommand):
+    help = "Recompute the \"similar spots\" recommendations for every spot (run nightly)."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stored = similarity.build()
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} recommendation(s) in {time.perf_counter() - started:.1f}s."
+        ))
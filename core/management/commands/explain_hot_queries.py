@@ -0,0 +1,79 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.models import CheckIn, Review, StaffApplication, StudySpot
+
+# PostgreSQL: "Seq Scan on core_studyspot"; SQLite: "SCAN core_studyspot"
+# (an indexed SQLite scan reads "SCAN core_studyspot USING INDEX ...").
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on (core_\w+|auth_user)"),
+    "sqlite": re.compile(r"\bSCAN (core_\w+|auth_user)\b(?! USING)"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every hot query from core/views.py against the current data "
+        "(seed it with `manage.py seed_data` first) and fail if any of them "
+        "scans a whole table. By default sequential scans are disabled for "
+        "the check, so it verifies that a usable index exists regardless of "
+        "table size; pass --real-plan to see what the planner picks on production-sized data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--real-plan",
+            action="store_true",
+            help="Keep the planner's defaults instead of disabling sequential scans.",
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in SEQ_SCAN_PATTERNS:
+            raise CommandError(f"explain_hot_queries does not support {vendor}.")
+
+        spot = StudySpot.objects.order_by("pk").first()
+        review = Review.objects.order_by("pk").first()
+        if spot is None or review is None:
+            raise CommandError("No data to explain against; run `manage.py seed_data` first.")
+
+        hot_queries = {
+            "my_listings": StudySpot.objects.filter(owner_id=spot.owner_id).order_by("-id"),
+            "landing (default sort)": StudySpot.objects.order_by("-is_trending", "-average_rating", "name"),
+            "landing (trending filter)": StudySpot.objects.filter(is_trending=True)
+                .order_by("-is_trending", "-average_rating", "name"),
+            "landing (rating sort)": StudySpot.objects.order_by("-average_rating", "name"),
+            "landing (name sort)": StudySpot.objects.order_by("name"),
+            "my_reviews": Review.objects.filter(user_id=review.user_id).order_by("-created_at"),
+            "studyspot_detail reviews": Review.objects.filter(spot_id=review.spot_id).order_by("-created_at"),
+            "active check-in for user": CheckIn.objects.filter(user_id=review.user_id, is_active=True),
+            "active check-ins at spot": CheckIn.objects.filter(spot_id=spot.pk, is_active=True),
+            "staff applications by status": StaffApplication.objects.filter(status="Pending"),
+        }
+
+        pattern = SEQ_SCAN_PATTERNS[vendor]
+        failures = []
+        with transaction.atomic():
+            if vendor == "postgresql" and not options["real_plan"]:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for label, queryset in hot_queries.items():
+                if vendor == "postgresql":
+                    plan = queryset.explain(analyze=True)
+                else:
+                    plan = queryset.explain()
+
+                scans = pattern.findall(plan)
+                status = self.style.ERROR("SEQ SCAN") if scans else self.style.SUCCESS("index")
+                self.stdout.write(f"{status:<8} {label}")
+                if options["verbosity"] > 1 or scans:
+                    self.stdout.write("    " + plan.replace("\n", "\n    "))
+                if scans:
+                    failures.append(f"{label} ({', '.join(sorted(set(scans)))})")
+
+        if failures:
+            raise CommandError("Sequential scans in: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"All {len(hot_queries)} hot queries use an index."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core import exports
+
+MODELS = {model._meta.model_name: model for model in exports.COLUMNS}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a table to CSV or NDJSON with constant memory. Uses the same "
+        "columns as the admin export actions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=sorted(MODELS))
+        parser.add_argument("--format", choices=sorted(exports.FORMATS), default="csv")
+        parser.add_argument("--output", "-o", help="File to write; defaults to stdout.")
+
+    def handle(self, *args, **options):
+        queryset = MODELS[options["model"]].objects.order_by("pk")
+        lines = exports.export_lines(queryset, options["format"])
+
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        count = 0
+        with open(options["output"], "w", newline="", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        if options["format"] == "csv":
+            count -= 1  # header
+        self.stderr.write(self.style.SUCCESS(f"Wrote {count} rows to {options['output']}"))
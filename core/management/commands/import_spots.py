@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Import study spots from a CSV or GeoJSON file. Rows are validated "
+        "like the listing form, duplicates (same normalized name and "
+        "coordinates, in the file or already stored) are skipped and the "
+        "rest are inserted in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="A .csv, .geojson or .json file.")
+        parser.add_argument("--owner", required=True, help="Username that will own the imported spots.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report without inserting.")
+        parser.add_argument("--report", help="Write the full report as JSON to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            owner = get_user_model().objects.get(username=options["owner"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['owner']!r}.")
+
+        reader = imports.reader_for(options["path"])
+        start = time.perf_counter()
+        try:
+            with open(options["path"], "rb") as f:
+                report = imports.import_spots(reader(f), owner, dry_run=options["dry_run"])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+        elapsed = time.perf_counter() - start
+
+        for error in report["errors"]:
+            messages = "; ".join(
+                f"{field}: {' '.join(e['message'] for e in errs)}" for field, errs in error["errors"].items()
+            )
+            self.stderr.write(f"  row {error['row']}: {messages}")
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+        verb = "Would create" if options["dry_run"] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created']} spots in {elapsed:.1f}s; "
+            f"{report['duplicates']} duplicates skipped, {report['invalid']} invalid rows."
+        ))
@@ -0,0 +1,77 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import load_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database latency (connect + SELECT 1 + request "
+        "teardown) with a new connection per request, persistent connections "
+        "and psycopg's connection pool. Runs against DATABASES['default']."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=4)
+
+    def handle(self, *args, **options):
+        base = connections["default"].settings_dict
+        if base["ENGINE"] != "django.db.backends.postgresql":
+            raise CommandError("loadtest_db needs a PostgreSQL database.")
+
+        concurrency = options["concurrency"]
+        modes = [
+            ("new connection per request", {"CONN_MAX_AGE": 0}, None),
+            ("persistent connections", {"CONN_MAX_AGE": None}, None),
+            ("psycopg pool", {"CONN_MAX_AGE": 0}, {"min_size": concurrency, "max_size": concurrency}),
+        ]
+
+        self.stdout.write(
+            f"{options['requests']} requests, concurrency {concurrency}, "
+            f"host {base['HOST']} (sslmode={base['OPTIONS'].get('sslmode')})"
+        )
+        for label, overrides, pool in modes:
+            settings_dict = {**base, **overrides, "OPTIONS": {**base["OPTIONS"]}}
+            settings_dict["OPTIONS"].pop("pool", None)
+            if pool:
+                settings_dict["OPTIONS"]["pool"] = pool
+
+            samples = self.run_mode(settings_dict, options["requests"], concurrency)
+            p50 = statistics.median(samples)
+            p99 = statistics.quantiles(samples, n=100)[98]
+            self.stdout.write(f"  {label:<28} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+    def run_mode(self, settings_dict, total, concurrency):
+        alias = f"loadtest_{id(settings_dict)}"
+        backend = load_backend(settings_dict["ENGINE"])
+        local = threading.local()
+        wrappers = []
+
+        def one_request(_):
+            # Each worker thread gets its own wrapper, like a gunicorn thread
+            if not hasattr(local, "conn"):
+                local.conn = backend.DatabaseWrapper(settings_dict, alias)
+                local.conn.inc_thread_sharing()  # closed from the main thread below
+                wrappers.append(local.conn)
+            conn = local.conn
+
+            start = time.perf_counter()
+            conn.close_if_unusable_or_obsolete()  # request_started
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.close_if_unusable_or_obsolete()  # request_finished
+            return (time.perf_counter() - start) * 1000
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                return list(executor.map(one_request, range(total)))
+        finally:
+            for conn in wrappers:
+                conn.close()
+            if wrappers:
+                wrappers[0].close_pool()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core import favorites, stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the cached site statistics and per-spot favorite counts "
+        "from the live tables (run nightly)."
+    )
+
+    def handle(self, *args, **options):
+        for key, value in stats.reconcile().items():
+            self.stdout.write(f"{key}: {value}")
+        self.stdout.write(f"favorite counts fixed: {favorites.recount()}")
+        self.stdout.write(self.style.SUCCESS("Site statistics reconciled."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core import hours
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute next_status_change_at for spots that just opened or closed "
+        "(run every minute). With AUTO_CHECKOUT_ON_CLOSE on, also check "
+        "everyone out of the closed ones."
+    )
+
+    def handle(self, *args, **options):
+        refreshed, checked_out = hours.refresh_due()
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {refreshed} spot(s); ended {checked_out} check-in(s) at closed spots."
+        ))
@@ -0,0 +1,162 @@
+import random
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core import hours, stats
+from core.cache import LANDING_NAMESPACE, bump_version
+from core.models import CheckIn, Review, StudySpot, UserProfile
+
+# Spots are scattered around CIT-U / Cebu City
+CENTER_LAT, CENTER_LNG = 10.2945, 123.8811
+AREAS = ["Cebu City", "Mandaue City", "Lapu-Lapu City", "Talisay City", "Banilad", "IT Park", "Lahug"]
+KINDS = ["Café", "Library", "Co-working", "Study Hub", "Tea House", "Reading Room"]
+COMMENTS = [
+    "Quiet and the Wi-Fi is fast.",
+    "Gets crowded after 3pm but the coffee is worth it.",
+    "Plenty of outlets, perfect for long sessions.",
+    "A bit noisy on weekends.",
+    "Great aircon, friendly staff.",
+    "",
+]
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert synthetic users, study spots, reviews and check-ins for "
+        "benchmarks. Popularity is skewed (a few spots get most reviews and "
+        "check-ins) and ratings lean positive, like the real data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spots", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=None, help="Default: half the number of spots (min 20).")
+        parser.add_argument("--reviews", type=int, default=None, help="Default: 5 per spot.")
+        parser.add_argument("--checkins", type=int, default=None, help="Default: 2 per user.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        spot_count = options["spots"]
+        user_count = options["users"] or max(20, spot_count // 2)
+        review_count = options["reviews"] if options["reviews"] is not None else spot_count * 5
+        checkin_count = options["checkins"] if options["checkins"] is not None else user_count * 2
+
+        with transaction.atomic():
+            users = self.create_users(user_count)
+            spots = self.create_spots(rng, spot_count, users)
+            reviews = self.create_reviews(rng, review_count, spots, users)
+            checkins = self.create_checkins(rng, checkin_count, spots, users)
+
+        # bulk_create skips signals: refresh the counters and cached pages
+        stats.reconcile()
+        hours.refresh(spots)
+        bump_version(LANDING_NAMESPACE)
+
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Seeded {len(users)} users, {len(spots)} spots, {reviews} reviews, {checkins} check-ins."
+            ))
+
+    def create_users(self, count):
+        start = User.objects.count()
+        password = make_password("studyhive-seed")  # hash once, not per user
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"seed_user_{start + i}",
+                    email=f"seed_user_{start + i}@example.com",
+                    first_name="Seed",
+                    last_name=f"User {start + i}",
+                    password=password,
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user, full_name=f"{user.first_name} {user.last_name}") for user in users],
+            batch_size=BATCH_SIZE,
+        )
+        return users
+
+    def create_spots(self, rng, count, users):
+        owners = users[: max(1, len(users) // 20)]  # ~5% of users are contributors
+        UserProfile.objects.filter(user__in=owners).update(is_contributor=True)
+
+        spots = []
+        for i in range(count):
+            open_24_7 = rng.random() < 0.15
+            opening = time(rng.choice([6, 7, 8, 9, 10]))
+            closing = time(rng.choice([18, 20, 21, 22, 23]))
+            spots.append(StudySpot(
+                owner=rng.choice(owners),
+                name=f"{rng.choice(KINDS)} {i}",
+                location=rng.choice(AREAS),
+                description=f"Synthetic study spot #{i}. " + rng.choice(COMMENTS),
+                wifi=rng.random() < 0.85,
+                ac=rng.random() < 0.6,
+                free=rng.random() < 0.3,
+                coffee=rng.random() < 0.5,
+                outlets=rng.random() < 0.7,
+                pastries=rng.random() < 0.3,
+                open_24_7=open_24_7,
+                is_trending=rng.random() < 0.05,
+                opening_time=None if open_24_7 else opening,
+                closing_time=None if open_24_7 else closing,
+                lat=CENTER_LAT + rng.gauss(0, 0.03),
+                lng=CENTER_LNG + rng.gauss(0, 0.03),
+            ))
+        return StudySpot.objects.bulk_create(spots, batch_size=BATCH_SIZE)
+
+    def popular(self, rng, items, k):
+        # Pareto weights: a handful of spots draw most of the traffic
+        weights = [rng.paretovariate(1.2) for _ in items]
+        return rng.choices(items, weights=weights, k=k)
+
+    def create_reviews(self, rng, count, spots, users):
+        now = timezone.now()
+        seen = set()
+        reviews = []
+        ratings = {}
+        for spot in self.popular(rng, spots, count):
+            user = rng.choice(users)
+            if (spot.pk, user.pk) in seen:
+                continue  # one review per user per spot
+            seen.add((spot.pk, user.pk))
+            rating = rng.choices([1, 2, 3, 4, 5], weights=[3, 5, 15, 37, 40])[0]
+            ratings.setdefault(spot.pk, []).append(rating)
+            reviews.append(Review(
+                spot=spot, user=user, rating=rating, comment=rng.choice(COMMENTS),
+            ))
+        Review.objects.bulk_create(reviews, batch_size=BATCH_SIZE)
+
+        # Spread created_at over the past year (auto_now_add ignores the value on insert)
+        for review in reviews:
+            review.created_at = now - timedelta(minutes=rng.randint(0, 525600))
+        Review.objects.bulk_update(reviews, ["created_at"], batch_size=BATCH_SIZE)
+
+        for spot in spots:
+            values = ratings.get(spot.pk)
+            spot.average_rating = Decimal(sum(values) / len(values)).quantize(Decimal("0.01")) if values else 0
+        StudySpot.objects.bulk_update(spots, ["average_rating"], batch_size=BATCH_SIZE)
+        return len(reviews)
+
+    def create_checkins(self, rng, count, spots, users):
+        checkins = []
+        active_users = set()
+        for spot in self.popular(rng, spots, count):
+            user = rng.choice(users)
+            # ~10% of check-ins are still open; at most one per user
+            is_active = user.pk not in active_users and rng.random() < 0.1
+            if is_active:
+                active_users.add(user.pk)
+            checkins.append(CheckIn(user=user, spot=spot, is_active=is_active))
+        CheckIn.objects.bulk_create(checkins, batch_size=BATCH_SIZE)
+        return len(checkins)
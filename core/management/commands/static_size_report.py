@@ -0,0 +1,73 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the transfer size of every static file as served before the "
+        "asset pipeline (the source file, uncompressed) and after it (the "
+        "minified, hashed file in its best precompressed form). Run after "
+        "collectstatic with STATIC_MANIFEST on."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=10, help="List the N largest files.")
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATIC_ROOT)
+        manifest = root / "staticfiles.json"
+        if not manifest.exists():
+            raise CommandError(f"{manifest} not found; run collectstatic with STATIC_MANIFEST=True first.")
+        with open(manifest, encoding="utf-8") as f:
+            paths = json.load(f)["paths"]
+
+        totals = defaultdict(lambda: [0, 0, 0])
+        rows = []
+        for name, hashed_name in sorted(paths.items()):
+            source = finders.find(name)
+            if source is None:
+                continue
+            before = Path(source).stat().st_size
+            minified = (root / hashed_name).stat().st_size
+            after, encoding = self.served_size(root / hashed_name)
+            kind = Path(name).suffix.lstrip(".").lower() or "other"
+            for key in (kind, "all"):
+                totals[key][0] += before
+                totals[key][1] += minified
+                totals[key][2] += after
+            rows.append((name, before, after, encoding))
+
+        self.stdout.write(f"{len(rows)} files in {manifest}")
+        self.stdout.write(f"  {'type':<8} {'before':>10} {'minified':>10} {'served':>10}  saved")
+        for kind in sorted(totals, key=lambda k: (k == "all", -totals[k][0])):
+            before, minified, after = totals[kind]
+            self.stdout.write(
+                f"  {kind:<8} {self.kb(before):>10} {self.kb(minified):>10} {self.kb(after):>10}"
+                f"  {self.saved(before, after)}"
+            )
+
+        self.stdout.write(f"\nLargest {options['top']} files (before -> served)")
+        for name, before, after, encoding in sorted(rows, key=lambda row: -row[1])[:options["top"]]:
+            self.stdout.write(
+                f"  {name:<40} {self.kb(before):>10} -> {self.kb(after):>10} {encoding:<8} {self.saved(before, after)}"
+            )
+
+    def served_size(self, path):
+        """Size of the smallest variant WhiteNoise would send to a browser that accepts br and gzip."""
+        sizes = [(path.stat().st_size, "identity")]
+        for suffix, encoding in ((".br", "br"), (".gz", "gzip")):
+            compressed = path.with_name(path.name + suffix)
+            if compressed.exists():
+                sizes.append((compressed.stat().st_size, encoding))
+        return min(sizes)
+
+    def kb(self, size):
+        return f"{size / 1024:.1f} KB"
+
+    def saved(self, before, after):
+        return f"{100 * (1 - after / before):.0f}%" if before else "-"
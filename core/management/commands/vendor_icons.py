@@ -0,0 +1,145 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+FONT_AWESOME_VERSION = "6.5.0"
+OUTPUT_DIR = Path(settings.BASE_DIR) / "static" / "vendor" / "fontawesome"
+SCANNED = [
+    (Path(settings.BASE_DIR) / "templates", "*.html"),
+    (Path(settings.BASE_DIR) / "static" / "js", "*.js"),
+]
+WEBFONTS = ["fa-solid-900", "fa-regular-400", "fa-brands-400"]
+FONT_FAMILIES = {"'Font Awesome 6 Free'", "'Font Awesome 6 Brands'"}
+
+ICON_CLASS_RE = re.compile(r"\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)(?![a-z0-9.-])")
+ICON_RULE_RE = re.compile(r"^\.fa-([a-z0-9-]+)::?before$")
+CONTENT_RE = re.compile(r'content:\s*"(\\[0-9a-f]+|.)"')
+LICENSE_RE = re.compile(r"^\s*/\*!.*?\*/", re.S)
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+TTF_SOURCE_RE = re.compile(r',\s*url\("[^"]+\.ttf"\)\s*format\("truetype"\)')
+
+
+def used_classes():
+    """Every fa-* class name that appears in the templates and scripts."""
+    names = set()
+    for directory, pattern in SCANNED:
+        for path in directory.rglob(pattern):
+            names.update(ICON_CLASS_RE.findall(path.read_text(encoding="utf-8")))
+    return names
+
+
+def _blocks(css):
+    """Top-level rules and at-rules of a stylesheet without comments."""
+    depth, start = 0, 0
+    for i, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                yield css[start:i + 1].strip()
+                start = i + 1
+
+
+def _codepoint(value):
+    return int(value[1:], 16) if value.startswith("\\") else ord(value)
+
+
+def subset_css(css, used):
+    """
+    Font Awesome's all.css cut down to the used icons: returns (css, icons,
+    codepoints). Version 4/5 compatibility faces and TrueType sources go too.
+    """
+    header = LICENSE_RE.match(css)
+    rules = [header.group(0).strip()] if header else []
+    icons, codepoints = set(), set()
+    for block in _blocks(COMMENT_RE.sub("", css)):
+        selectors, body = block.split("{", 1)
+        selectors = [selector.strip() for selector in selectors.split(",")]
+        names = [ICON_RULE_RE.match(selector) for selector in selectors]
+
+        if all(names):
+            kept = [selector for selector, name in zip(selectors, names) if name.group(1) in used]
+            if not kept:
+                continue
+            icons.update(name.group(1) for name in names if name.group(1) in used)
+            codepoints.update(_codepoint(value) for value in CONTENT_RE.findall(body))
+            block = ",".join(kept) + "{" + body
+        elif selectors == ["@font-face"]:
+            family = re.search(r"font-family:\s*([^;]+);", body).group(1).strip()
+            if family not in FONT_FAMILIES:
+                continue
+            block = TTF_SOURCE_RE.sub("", block)
+        rules.append(re.sub(r"\s*\n\s*", " ", block))
+    return "\n".join(rules) + "\n", icons, codepoints
+
+
+def subset_font(source, target, codepoints):
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    # The icon names are ligatures; the CSS only uses codepoints
+    options.layout_features = []
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    subset.save_font(font, str(target), options)
+
+
+class Command(BaseCommand):
+    help = (
+        f"Rebuild static/vendor/fontawesome from Font Awesome Free {FONT_AWESOME_VERSION}, "
+        "keeping only the icons the templates and scripts use. Run it after "
+        "using a new icon. Needs fontTools and brotli, and the fontawesomefree "
+        "package or --source (a Font Awesome Free download)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", help="Directory with css/all.css and webfonts/.")
+
+    def handle(self, *args, **options):
+        try:
+            import fontTools  # noqa: F401
+        except ImportError:
+            raise CommandError("fontTools is not installed: pip install fonttools brotli")
+        source = self.source_dir(options["source"])
+
+        used = used_classes()
+        css, icons, codepoints = subset_css((source / "css" / "all.css").read_text(encoding="utf-8"), used)
+
+        (OUTPUT_DIR / "css").mkdir(parents=True, exist_ok=True)
+        (OUTPUT_DIR / "webfonts").mkdir(parents=True, exist_ok=True)
+        (OUTPUT_DIR / "css" / "fontawesome.css").write_text(css, encoding="utf-8")
+        for name in WEBFONTS:
+            source_font = source / "webfonts" / f"{name}.woff2"
+            target = OUTPUT_DIR / "webfonts" / f"{name}.woff2"
+            subset_font(source_font, target, codepoints)
+            self.stdout.write(
+                f"{name}.woff2: {source_font.stat().st_size / 1024:.1f} KB -> {target.stat().st_size / 1024:.1f} KB"
+            )
+
+        self.stdout.write(f"{len(icons)} icons, fontawesome.css {len(css) / 1024:.1f} KB")
+        unknown = sorted(used - icons - self.utility_classes(css))
+        if unknown:
+            self.stdout.write(self.style.WARNING(
+                f"Not in Font Awesome Free {FONT_AWESOME_VERSION}: {', '.join(unknown)}"
+            ))
+
+    def source_dir(self, path):
+        if path:
+            return Path(path)
+        try:
+            import fontawesomefree
+        except ImportError:
+            raise CommandError(
+                f"Pass --source or pip install fontawesomefree=={FONT_AWESOME_VERSION}"
+            )
+        return Path(fontawesomefree.__file__).resolve().parent / "static" / "fontawesomefree"
+
+    def utility_classes(self, css):
+        """fa-* classes that are not icons (fa-solid, fa-spin, ...)."""
+        return set(re.findall(r"\.fa-([a-z0-9-]+)(?![a-z0-9-]|::?before)", css))
@@ -0,0 +1,118 @@
+"""
+Prometheus metrics, served at /metrics.
+
+Counters and histograms live in each process. Under gunicorn set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers (and
+wiped on deploy): each worker then writes its values to mmap'd files there,
+and a scrape of any worker adds up all of them. gunicorn.conf.py cleans up
+after workers that exit.
+
+Active check-ins are counted from the database at scrape time, so the value
+is the same whichever worker answers.
+"""
+
+import hmac
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .models import CheckIn
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    "studyhive_request_duration_seconds",
+    "Time to respond, by URL name.",
+    ["view", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter(
+    "studyhive_db_queries",
+    "Database queries run while handling requests, by URL name.",
+    ["view"],
+)
+DB_QUERY_SECONDS = Counter(
+    "studyhive_db_query_seconds",
+    "Time spent in database queries, by URL name.",
+    ["view"],
+)
+CHECKIN_TOGGLES = Counter(
+    "studyhive_checkin_toggles",
+    "Check-in toggle outcomes: in, out, switch, closed (rejected) or closing (ended when the spot closed).",
+    ["outcome"],
+)
+REVIEWS_CREATED = Counter(
+    "studyhive_reviews_created",
+    "Reviews written.",
+)
+STORAGE_LATENCY = Histogram(
+    "studyhive_storage_request_duration_seconds",
+    "Supabase Storage call latency, by operation.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+STORAGE_ERRORS = Counter(
+    "studyhive_storage_errors",
+    "Supabase Storage calls that raised, by operation.",
+    ["operation"],
+)
+
+
+def observe_request(view, method, seconds, db_queries, db_seconds):
+    view = view or "unmatched"  # never label by raw path
+    REQUEST_LATENCY.labels(view, method).observe(seconds)
+    if db_queries:
+        DB_QUERIES.labels(view).inc(db_queries)
+        DB_QUERY_SECONDS.labels(view).inc(db_seconds)
+
+
+class ActiveCheckInsCollector:
+    def collect(self):
+        yield GaugeMetricFamily(
+            "studyhive_active_checkins",
+            "Users currently checked in.",
+            value=CheckIn.objects.filter(is_active=True).count(),
+        )
+
+
+class _ProcessMetrics:
+    """This process's own metrics, for runserver and single-worker servers."""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def registry():
+    scrape_registry = CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.MultiProcessCollector(scrape_registry)
+    else:
+        scrape_registry.register(_ProcessMetrics())
+    scrape_registry.register(ActiveCheckInsCollector())
+    return scrape_registry
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. With METRICS_TOKEN set the scraper must send
+    `Authorization: Bearer <token>`; without it the endpoint only answers
+    when DEBUG is on.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            raise Http404
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .models import UserProfile
+from .routers import end_request, pin_to_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_COOKIE = "use_primary"
+
+
+class ReplicaPinningMiddleware:
+    """
+    Routes every query of a request to the primary when the request is a
+    write (POST etc.) or the browser wrote within the last
+    REPLICA_PIN_SECONDS, so replica lag never hides a user's own changes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+        tokens = pin_to_primary(pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request(tokens)
+
+        if wrote and settings.REPLICA_DATABASES:
+            response.set_cookie(
+                PIN_COOKIE, "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def get_profile(request):
+    if not request.user.is_authenticated:
+        return None
+    try:
+        # Already loaded with the user by EmailOrUsernameBackend.get_user()
+        return request.user.userprofile
+    except UserProfile.DoesNotExist:
+        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        request.user.userprofile = profile
+        return profile
+
+
+class UserProfileMiddleware:
+    """
+    Sets a lazy `request.profile` so views, decorators and templates share
+    one UserProfile instance per request instead of each querying for it.
+    Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        return self.get_response(request)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Functional indexes on auth_user for EmailOrUsernameBackend, which looks
+    users up by LOWER(email) or LOWER(username). auth_user belongs to
+    django.contrib.auth, so the indexes are created with raw SQL here.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0022_tracked_models_updated_at_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX core_auth_user_email_lower ON auth_user (LOWER(email));',
+            reverse_sql='DROP INDEX IF EXISTS core_auth_user_email_lower;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX core_auth_user_username_lower ON auth_user (LOWER(username));',
+            reverse_sql='DROP INDEX IF EXISTS core_auth_user_username_lower;',
+        ),
+    ]
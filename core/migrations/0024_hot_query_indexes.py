@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_auth_user_lower_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checkin',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['spot'], name='checkin_active_spot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', '-created_at'], name='review_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['spot', '-created_at'], name='review_spot_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffapplication',
+            index=models.Index(fields=['status'], name='staffapp_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studyspot',
+            index=models.Index(fields=['owner', '-id'], name='studyspot_owner_id_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studyspot',
+            index=models.Index(fields=['-is_trending', '-average_rating', 'name'], name='studyspot_default_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studyspot',
+            index=models.Index(fields=['-average_rating', 'name'], name='studyspot_rating_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studyspot',
+            index=models.Index(fields=['name'], name='studyspot_name_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:05
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_geocodecacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studyspot',
+            name='next_status_change_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='studyspot',
+            name='time_zone',
+            field=models.CharField(db_index=True, default=core.models.default_time_zone, max_length=64, validators=[core.models.validate_time_zone]),
+        ),
+        migrations.CreateModel(
+            name='OpeningHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('opens', models.TimeField(blank=True, null=True)),
+                ('closes', models.TimeField(blank=True, null=True)),
+                ('spot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_hours', to='core.studyspot')),
+            ],
+            options={
+                'verbose_name_plural': 'opening hours',
+                'ordering': ['weekday', 'opens'],
+                'indexes': [models.Index(fields=['spot', 'weekday'], name='openinghours_spot_day_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('closes__isnull', True), ('opens__isnull', True)), models.Q(('closes__isnull', False), ('opens__isnull', False)), _connector='OR'), name='openinghours_times_paired')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SpecialHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('opens', models.TimeField(blank=True, null=True)),
+                ('closes', models.TimeField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, max_length=100)),
+                ('spot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='special_hours', to='core.studyspot')),
+            ],
+            options={
+                'verbose_name_plural': 'special hours',
+                'ordering': ['date', 'opens'],
+                'indexes': [models.Index(fields=['spot', 'date'], name='specialhours_spot_date_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('closes__isnull', True), ('opens__isnull', True)), models.Q(('closes__isnull', False), ('opens__isnull', False)), _connector='OR'), name='specialhours_times_paired')],
+            },
+        ),
+    ]
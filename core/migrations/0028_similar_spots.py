@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_favorites'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarSpot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.studyspot')),
+                ('spot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_spots', to='core.studyspot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('spot', 'rank'), name='unique_similar_rank')],
+            },
+        ),
+    ]
@@ -1,19 +1,87 @@
-from django.utils import timezone
+import zoneinfo
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg, Q
+from django.db.models import Avg, F, Q
 from datetime import time
 
 # --- 1. MANAGERS ---
-class CheckInManager(models.Manager):
+class TrackedQuerySet(models.QuerySet):
+    def changed_since(self, since):
+        """Rows modified after `since`, oldest first, for delta sync and cache checks."""
+        return self.filter(updated_at__gt=since).order_by("updated_at", "pk")
+
+
+TrackedManager = models.Manager.from_queryset(TrackedQuerySet)
+
+
+class CheckInManager(TrackedManager):
     """Custom manager to easily fetch active checkins."""
     def active_only(self):
         return self.filter(is_active=True)
 
+
+class TrackedModel(models.Model):
+    """
+    Adds an indexed `updated_at` timestamp and a `version` counter that goes
+    up on every save(), so caches and clients can tell whether a row changed
+    without comparing its contents. QuerySet.update() bypasses save(), so
+    bulk writers must bump both columns themselves.
+    """
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    version = models.PositiveIntegerField(default=1)
+
+    objects = TrackedManager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        bumped = not self._state.adding
+        if bumped:
+            # None when the field was deferred
+            previous = self.__dict__.get("version")
+            # Incremented in the UPDATE itself: concurrent saves of stale
+            # instances still each get their own version
+            self.version = F("version") + 1
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "updated_at", "version"}
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            if bumped:
+                if previous is None:
+                    self.__dict__.pop("version", None)
+                else:
+                    self.version = previous
+            raise
+
+    def _save_table(self, *args, **kwargs):
+        updated = super()._save_table(*args, **kwargs)
+        if hasattr(self.__dict__.get("version"), "resolve_expression"):
+            # Deferred instead of read back: the new number is only loaded
+            # if something asks for it, post_save receivers included
+            del self.__dict__["version"]
+        return updated
+
 # --- 2. CORE MODELS ---
 
-class UserProfile(models.Model):
+def default_time_zone():
+    return settings.SPOT_TIME_ZONE
+
+
+def validate_time_zone(value):
+    try:
+        zoneinfo.ZoneInfo(value)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"Unknown time zone: {value}")
+
+
+class UserProfile(TrackedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     full_name = models.CharField(max_length=100, blank=True, null=True)
     middle_initial = models.CharField(max_length=1, blank=True, null=True)
@@ -26,7 +94,7 @@ class UserProfile(models.Model):
     def __str__(self):
         return self.user.username
 
-class StudySpot(models.Model):
+class StudySpot(TrackedModel):
     name = models.CharField(max_length=255)
     location = models.CharField(max_length=255)
     description = models.TextField()
@@ -54,10 +122,39 @@ class StudySpot(models.Model):
     pastries = models.BooleanField(default=False)
     is_trending = models.BooleanField(default=False)
 
+    # Everyday hours; per-weekday OpeningHours and dated SpecialHours
+    # override them. Read through core.hours, never compared directly.
     opening_time = models.TimeField(null=True, blank=True)
     closing_time = models.TimeField(null=True, blank=True)
+    time_zone = models.CharField(
+        max_length=64, default=default_time_zone, validators=[validate_time_zone], db_index=True,
+    )
+    # When the spot next opens or closes (or must be re-checked), kept by
+    # core.hours; caches and the refresh_opening_hours job key off it.
+    next_status_change_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
 
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    # Denormalized Favorite count, kept by core.signals (not save()) and
+    # recounted nightly by reconcile_site_stats
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Match the orderings used by landing_view and my_listings
+        indexes = [
+            models.Index(fields=["owner", "-id"], name="studyspot_owner_id_desc_idx"),
+            models.Index(fields=["-is_trending", "-average_rating", "name"], name="studyspot_default_order_idx"),
+            models.Index(fields=["-average_rating", "name"], name="studyspot_rating_order_idx"),
+            models.Index(fields=["name"], name="studyspot_name_idx"),
+            models.Index(fields=["-favorite_count", "-average_rating", "name"], name="studyspot_popular_order_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        spot = super().from_db(db, field_names, values)
+        # The stored location, so the site statistics can tell a move from
+        # a save that leaves it alone (None when it was deferred)
+        spot._saved_location = spot.__dict__.get("location")
+        return spot
 
     # User checkins counts
     @property
@@ -72,30 +169,19 @@ class StudySpot(models.Model):
     def update_average_rating(self):
         average = self.reviews.aggregate(Avg('rating'))['rating__avg']
         self.average_rating = round(average or 0, 2)
-        self.save()
+        self.save(update_fields=["average_rating"])
 
     def __str__(self):
         return self.name
     
     @property
     def is_closed(self):
-        """Returns True if the spot is currently closed based on time and 24/7 setting."""
-        if self.open_24_7 or not self.closing_time:
-            return False
-
-        now = timezone.localtime().time()
-
-        # Overnight closing (e.g., open 6PM → close 2AM)
-        if self.closing_time < self.opening_time:
-            # Spot closes after midnight
-            if now >= self.closing_time and now < self.opening_time:
-                return True
-        else:
-            # Normal closing
-            if now >= self.closing_time or now < self.opening_time:
-                return True
-
-        return False
+        """True if the spot is closed right now, in its own time zone."""
+        if hasattr(self, "is_open"):
+            # Annotated by core.hours.annotate_open()
+            return not self.is_open
+        from . import hours
+        return not hours.status_at(self)[0]
 
 class StaffApplication(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -129,10 +215,15 @@ class StaffApplication(models.Model):
 
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="staffapp_status_idx"),
+        ]
+
     def __str__(self):
         return f"{self.full_name} ({self.status})"
 
-class Review(models.Model):
+class Review(TrackedModel):
     spot = models.ForeignKey(StudySpot, on_delete=models.CASCADE, related_name="reviews")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reviews")
     rating = models.IntegerField(
@@ -143,13 +234,17 @@ class Review(models.Model):
 
     class Meta:
         unique_together = ('spot', 'user')
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="review_user_created_idx"),
+            models.Index(fields=["spot", "-created_at"], name="review_spot_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s review for {self.spot.name}"
 
 # --- 3. CHECKIN MODEL ---
 
-class CheckIn(models.Model):
+class CheckIn(TrackedModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='checkins')
     spot = models.ForeignKey(StudySpot, on_delete=models.CASCADE, related_name='active_users')
     check_in_time = models.DateTimeField(auto_now_add=True)
@@ -165,6 +260,16 @@ class CheckIn(models.Model):
                 name='unique_active_checkin'
             )
         ]
+        indexes = [
+            # Who is studying at a spot right now; the unique constraint
+            # above already covers the per-user lookup.
+            models.Index(fields=["spot"], condition=Q(is_active=True), name="checkin_active_spot_idx"),
+        ]
+
+    def check_out(self):
+        """End this check-in through save(), so the signal handlers see it."""
+        self.is_active = False
+        self.save(update_fields=["is_active"])
 
     def __str__(self):
         status = "Checked In" if self.is_active else "Checked Out"
@@ -172,3 +277,139 @@ class CheckIn(models.Model):
     
 
 
+
+# --- 4. SITE STATISTICS ---
+
+class SiteStatistic(models.Model):
+    """
+    One precomputed site-wide counter (e.g. number of study spots).
+    Kept current by core.signals and reconciled nightly by the
+    `reconcile_site_stats` management command; read through core.stats.
+    """
+    key = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+# --- 5. GEOCODING CACHE ---
+
+class GeocodeCacheEntry(models.Model):
+    """
+    One geocoder answer, keyed by normalized address ("fwd:...") or rounded
+    coordinates ("rev:..."). A miss is stored too (lat/lng null) so unknown
+    addresses are not looked up again until it expires. Read through
+    core.geocoding.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    lat = models.FloatField(null=True, blank=True)
+    lng = models.FloatField(null=True, blank=True)
+    address = models.CharField(max_length=500, blank=True)
+    provider = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
+
+
+# --- 6. OPENING HOURS ---
+
+WEEKDAYS = [
+    (0, "Monday"), (1, "Tuesday"), (2, "Wednesday"), (3, "Thursday"),
+    (4, "Friday"), (5, "Saturday"), (6, "Sunday"),
+]
+
+BOTH_TIMES_OR_NEITHER = Q(opens__isnull=True, closes__isnull=True) | Q(opens__isnull=False, closes__isnull=False)
+
+
+class OpeningHours(models.Model):
+    """
+    One opening interval on a weekday, replacing the spot's everyday
+    opening_time/closing_time on that day. A day may have several rows; a
+    row without times marks the day closed. `closes` at or before `opens`
+    runs past midnight (equal times: 24 hours). Read through core.hours.
+    """
+    spot = models.ForeignKey(StudySpot, on_delete=models.CASCADE, related_name="weekly_hours")
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS)
+    opens = models.TimeField(null=True, blank=True)
+    closes = models.TimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["weekday", "opens"]
+        verbose_name_plural = "opening hours"
+        indexes = [
+            models.Index(fields=["spot", "weekday"], name="openinghours_spot_day_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=BOTH_TIMES_OR_NEITHER, name="openinghours_times_paired"),
+        ]
+
+    def __str__(self):
+        return f"{self.spot} {self.get_weekday_display()} {self.opens or 'closed'}-{self.closes or ''}"
+
+
+class SpecialHours(models.Model):
+    """
+    Hours for one date (a holiday, an event) that replace everything else
+    for that day, 24/7 included. Same interval rules as OpeningHours.
+    """
+    spot = models.ForeignKey(StudySpot, on_delete=models.CASCADE, related_name="special_hours")
+    date = models.DateField()
+    opens = models.TimeField(null=True, blank=True)
+    closes = models.TimeField(null=True, blank=True)
+    note = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ["date", "opens"]
+        verbose_name_plural = "special hours"
+        indexes = [
+            models.Index(fields=["spot", "date"], name="specialhours_spot_date_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=BOTH_TIMES_OR_NEITHER, name="specialhours_times_paired"),
+        ]
+
+    def __str__(self):
+        return f"{self.spot} {self.date} {self.opens or 'closed'}-{self.closes or ''}"
+
+
+# --- 7. FAVORITES ---
+
+class Favorite(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="favorites")
+    spot = models.ForeignKey(StudySpot, on_delete=models.CASCADE, related_name="favorited_by")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also serves "which spots has this user favorited"
+            models.UniqueConstraint(fields=["user", "spot"], name="unique_favorite"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ♥ {self.spot.name}"
+
+
+# --- 8. SIMILAR SPOTS ---
+
+class SimilarSpot(models.Model):
+    """
+    One precomputed "similar spot" recommendation: `similar` is the
+    `rank`-th nearest neighbour of `spot`. Rebuilt nightly by the
+    `build_similar_spots` command (core.similarity), never in a request.
+    """
+    spot = models.ForeignKey(StudySpot, on_delete=models.CASCADE, related_name="similar_spots")
+    similar = models.ForeignKey(StudySpot, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            # Also the index behind "the list for this spot, in order"
+            models.UniqueConstraint(fields=["spot", "rank"], name="unique_similar_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.spot_id} #{self.rank} {self.similar_id} ({self.score:.2f})"
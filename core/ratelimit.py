@@ -0,0 +1,105 @@
+"""
+Sliding-window rate limiting backed by the default cache.
+
+Each (scope, identity) pair keeps one counter per fixed window. The rate is
+estimated as the current window's count plus the previous window's count
+weighted by how much of it still overlaps the sliding window, which avoids
+the burst that plain fixed windows allow at every boundary.
+"""
+
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+
+# ---------- IDENTITIES ----------
+
+def client_ip(request):
+    """
+    The client's address. Behind RATELIMIT_PROXY_COUNT trusted proxies the
+    address they appended to X-Forwarded-For is used, never one the client
+    could have written itself.
+    """
+    proxies = settings.RATELIMIT_PROXY_COUNT
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",")]
+        if len(hops) >= proxies:
+            return hops[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def post_field(name):
+    """Identity taken from a submitted form field, e.g. the account being logged into."""
+    def key(request):
+        return request.POST.get(name, "").strip().lower()
+    return key
+
+
+def user_id(request):
+    return str(request.user.pk) if request.user.is_authenticated else client_ip(request)
+
+
+# ---------- LIMITER ----------
+
+def hit(key, limit, window):
+    """
+    Record one attempt for `key`. Returns None while under `limit` attempts
+    per `window` seconds, otherwise the number of seconds to wait.
+    """
+    now = time.time()
+    current = int(now // window)
+    elapsed = now - current * window
+    digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+    current_key = f"ratelimit:{digest}:{current}"
+    previous_key = f"ratelimit:{digest}:{current - 1}"
+
+    cache.add(current_key, 0, timeout=window * 2)
+    try:
+        count = cache.incr(current_key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(current_key, 1, timeout=window * 2)
+        count = 1
+    previous = cache.get(previous_key, 0)
+
+    rate = previous * (window - elapsed) / window + count
+    if rate <= limit:
+        return None
+    return max(1, math.ceil(window - elapsed))
+
+
+def too_many_requests(request, retry_after, json=False):
+    message = f"Too many attempts. Please try again in {retry_after} seconds."
+    if json:
+        response = JsonResponse({"error": message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type="text/plain")
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def rate_limit(scope, limit, window, key=client_ip, methods=("POST",), json=False):
+    """
+    Reject requests to the decorated view with 429 once `key(request)` has
+    made more than `limit` attempts in `window` seconds. Stack it to limit
+    by several identities (e.g. per IP and per account). Views that answer
+    with JSON pass json=True to get a JSON 429 as well.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                identity = key(request)
+                if identity:
+                    retry_after = hit(f"{scope}:{identity}", limit, window)
+                    if retry_after:
+                        return too_many_requests(request, retry_after, json)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,49 @@
+"""
+Database router that sends reads to replicas and writes to the primary.
+
+Replica aliases are listed in settings.REPLICA_DATABASES. A request that
+writes, or that follows a recent write from the same browser (see
+ReplicaPinningMiddleware), reads from the primary instead so users always
+see their own reviews and check-ins straight away.
+"""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_use_primary = ContextVar("use_primary", default=False)
+_has_written = ContextVar("has_written", default=False)
+
+
+def pin_to_primary(pinned):
+    """Start a request; returns tokens for end_request()."""
+    return _use_primary.set(pinned), _has_written.set(False)
+
+
+def end_request(tokens):
+    """Restore the previous state; returns True if the request wrote."""
+    wrote = _has_written.get()
+    _use_primary.reset(tokens[0])
+    _has_written.reset(tokens[1])
+    return wrote
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if not replicas or _use_primary.get() or _has_written.get():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _has_written.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias points at a copy of the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,200 @@
+"""
+Road routes for "Get Directions" on the map, proxied through the server.
+
+Both ends are snapped to a grid of ROUTE_GRID_DECIMALS (3 decimals is about
+110 m), so everyone asking for directions from around campus to the same
+spot shares one cached route. Routes are kept in a per-process LRU of
+ROUTE_CACHE_SIZE entries and their geometry is simplified with
+Douglas-Peucker (ROUTE_SIMPLIFY_METERS) before it is cached and sent.
+
+The backend is pluggable through the ROUTER setting: OSRMRouter talks to
+any OSRM-compatible server (ROUTER_URL), and StraightLineRouter is an
+offline stand-in for tests. If the backend fails, a straight line is
+returned marked "approximate" and is not cached.
+"""
+
+import logging
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+import httpx
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371000
+STRAIGHT_LINE_SPEED = 30 / 3.6  # m/s, a rough city average
+
+
+class Route(NamedTuple):
+    distance: float  # metres
+    duration: float  # seconds
+    coordinates: list  # [[lat, lng], ...]
+
+
+class RouteNotFound(Exception):
+    pass
+
+
+# ---------- GEOMETRY ----------
+
+def haversine(a, b):
+    lat1, lng1, lat2, lng2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def simplify(points, tolerance):
+    """
+    Douglas-Peucker on [lat, lng] points: drop every point closer than
+    `tolerance` metres to the line through the points it sits between.
+    """
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    # Local equirectangular projection to metres; exact enough at route scale
+    lat0 = math.radians(points[0][0])
+    scale = math.pi / 180 * EARTH_RADIUS_M
+    xy = [(lng * scale * math.cos(lat0), lat * scale) for lat, lng in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        farthest, max_distance = None, tolerance
+        for i in range(first + 1, last):
+            x, y = xy[i]
+            if length:
+                distance = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / length
+            else:
+                distance = math.hypot(x - x1, y - y1)
+            if distance > max_distance:
+                farthest, max_distance = i, distance
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+# ---------- BACKENDS ----------
+
+class OSRMRouter:
+    def __init__(self):
+        self.client = httpx.Client(base_url=settings.ROUTER_URL, timeout=settings.ROUTER_TIMEOUT)
+
+    def route(self, origin, destination):
+        path = (
+            f"/route/v1/{settings.ROUTER_PROFILE}/"
+            f"{origin[1]},{origin[0]};{destination[1]},{destination[0]}"
+        )
+        response = self.client.get(path, params={"overview": "full", "geometries": "geojson"})
+        data = response.json()
+        if data.get("code") in ("NoRoute", "NoSegment") or not data.get("routes"):
+            raise RouteNotFound(data.get("message", "No route found."))
+        response.raise_for_status()
+        route = data["routes"][0]
+        return Route(
+            distance=route["distance"],
+            duration=route["duration"],
+            coordinates=[[lat, lng] for lng, lat in route["geometry"]["coordinates"]],
+        )
+
+
+class StraightLineRouter:
+    """Offline stand-in: a densified straight line at city driving speed."""
+
+    steps = 20
+
+    def route(self, origin, destination):
+        distance = haversine(origin, destination)
+        coordinates = [
+            [origin[0] + (destination[0] - origin[0]) * i / self.steps,
+             origin[1] + (destination[1] - origin[1]) * i / self.steps]
+            for i in range(self.steps + 1)
+        ]
+        return Route(distance, distance / STRAIGHT_LINE_SPEED, coordinates)
+
+
+@lru_cache(maxsize=None)
+def _load_router(path):
+    return import_string(path)()
+
+
+def get_router():
+    return _load_router(settings.ROUTER)
+
+
+# ---------- CACHE ----------
+
+class RouteCache:
+    """Thread-safe LRU of routes keyed by snapped endpoints."""
+
+    def __init__(self):
+        self._routes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            route = self._routes.get(key)
+            if route is not None:
+                self._routes.move_to_end(key)
+            return route
+
+    def set(self, key, route):
+        with self._lock:
+            self._routes[key] = route
+            self._routes.move_to_end(key)
+            while len(self._routes) > settings.ROUTE_CACHE_SIZE:
+                self._routes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_cache = RouteCache()
+
+
+def snap(point):
+    decimals = settings.ROUTE_GRID_DECIMALS
+    return (round(point[0], decimals), round(point[1], decimals))
+
+
+def _compact(route):
+    # ~1 m precision is plenty for a polyline and halves the payload
+    return Route(
+        round(route.distance),
+        round(route.duration),
+        [[round(lat, 5), round(lng, 5)] for lat, lng in simplify(route.coordinates, settings.ROUTE_SIMPLIFY_METERS)],
+    )
+
+
+def find_route(origin, destination):
+    """
+    Return (route, cached, approximate) between two (lat, lng) points.
+    Raises RouteNotFound if the backend says there is no road route.
+    """
+    key = (snap(origin), snap(destination))
+    route = route_cache.get(key)
+    if route is not None:
+        return route, True, False
+
+    try:
+        route = _compact(get_router().route(*key))
+    except RouteNotFound:
+        raise
+    except (httpx.HTTPError, ValueError, KeyError) as e:
+        logger.warning("Routing backend failed for %s: %s", key, e)
+        return _compact(StraightLineRouter().route(*key)), False, True
+
+    route_cache.set(key, route)
+    return route, False, False
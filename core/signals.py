@@ -1,13 +1,110 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from django.core.cache import cache
+from django.db.models import F
+from .models import UserProfile, StudySpot, Review, CheckIn, OpeningHours, SpecialHours, Favorite
+from .cache import LANDING_NAMESPACE, bump_version, spot_namespace
+from . import favorites, hours, metrics, stats
+from .usernames import record_username
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
+    # Only on the first save. Views save the profile themselves, with
+    # update_fields, when they change it; logins and other User saves
+    # leave the profile row alone.
     if created:
         UserProfile.objects.create(user=instance)
 
+
+# ---------- CACHE INVALIDATION ----------
+
+@receiver([post_save, post_delete], sender=StudySpot)
+def invalidate_spot_cache(sender, instance, **kwargs):
+    # Spot cards on the landing page and the spot's own detail fragments
+    bump_version(LANDING_NAMESPACE)
+    bump_version(spot_namespace(instance.pk))
+
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=CheckIn)
+def invalidate_spot_detail_cache(sender, instance, **kwargs):
+    # Rating changes reach the landing page through StudySpot.save()
+    # in update_average_rating(), so only the detail page is bumped here.
+    bump_version(spot_namespace(instance.spot_id))
+
+
+# ---------- SITE STATISTICS ----------
+
+@receiver(post_save, sender=StudySpot)
+def update_spot_stats(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        stats.increment(stats.STUDY_SPOTS)
+    if update_fields is not None and "location" not in update_fields:
+        return
+    # Only a new spot or a changed location can change the number of cities
+    if instance.location != getattr(instance, "_saved_location", None):
+        stats.recompute(stats.CITIES)
+    instance._saved_location = instance.location
+
+@receiver(post_delete, sender=StudySpot)
+def remove_spot_stats(sender, instance, **kwargs):
+    stats.increment(stats.STUDY_SPOTS, -1)
+    stats.recompute(stats.CITIES)
+
+@receiver(post_save, sender=User)
+def update_user_stats(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        if instance.is_active:
+            stats.increment(stats.ACTIVE_USERS)
+    # Logins save with update_fields=["last_login"] and are skipped here
+    elif update_fields is None or "is_active" in update_fields:
+        stats.recompute(stats.ACTIVE_USERS)
+
+@receiver(post_delete, sender=User)
+def remove_user_stats(sender, instance, **kwargs):
+    stats.recompute(stats.ACTIVE_USERS)
+
+
+# ---------- OPENING HOURS ----------
+
+@receiver(post_save, sender=StudySpot)
+def refresh_next_status_change(sender, instance, update_fields=None, **kwargs):
+    # Rating updates and the like save with update_fields and are skipped.
+    # Re-read the row: views assign the times as strings from the form.
+    if update_fields is None or {"open_24_7", "opening_time", "closing_time", "time_zone"} & set(update_fields):
+        hours.refresh(StudySpot.objects.filter(pk=instance.pk).only(*hours.HOURS_FIELDS))
+
+@receiver([post_save, post_delete], sender=OpeningHours)
+@receiver([post_save, post_delete], sender=SpecialHours)
+def refresh_spot_hours(sender, instance, **kwargs):
+    hours.hours_changed(instance.spot_id)
+
+
+# ---------- FAVORITES ----------
+
+@receiver(post_save, sender=Favorite)
+def count_favorite(sender, instance, created, **kwargs):
+    if created:
+        StudySpot.objects.filter(pk=instance.spot_id).update(favorite_count=F("favorite_count") + 1)
+        cache.delete(favorites.cache_key(instance.user_id))
+
+@receiver(post_delete, sender=Favorite)
+def uncount_favorite(sender, instance, **kwargs):
+    StudySpot.objects.filter(pk=instance.spot_id, favorite_count__gt=0).update(favorite_count=F("favorite_count") - 1)
+    cache.delete(favorites.cache_key(instance.user_id))
+
+
+# ---------- USERNAME INDEX ----------
+
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.userprofile.save()
\ No newline at end of file
+def index_username(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "username" in update_fields:
+        record_username(instance.username)
+
+
+# ---------- METRICS ----------
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, **kwargs):
+    if created:
+        metrics.REVIEWS_CREATED.inc()
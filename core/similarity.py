@@ -0,0 +1,155 @@
+"""
+"Similar spots" recommendations, precomputed nightly.
+
+`build()` scores every pair of spots as a weighted sum of three
+similarities:
+
+* amenities and rating: cosine of the amenity flags plus rating/5,
+* location: exp(-distance / DISTANCE_SCALE_KM),
+* behaviour: cosine over the users who checked in at or reviewed both
+  spots ("people who studied at A also studied at B").
+
+It then keeps the TOP_K best per spot in SimilarSpot. Scoring runs on
+NumPy arrays, BLOCK_SIZE rows of the spot x spot matrix at a time, so
+memory stays at BLOCK_SIZE x N floats however many spots there are.
+
+Requests only read the stored lists (`similar_to`, one indexed query) and
+never compute anything. Run `manage.py build_similar_spots` nightly.
+"""
+
+import numpy as np
+from django.db import transaction
+
+from .models import CheckIn, Review, SimilarSpot, StudySpot
+
+TOP_K = 6
+BLOCK_SIZE = 1024
+INSERT_BATCH_SIZE = 2000
+
+AMENITY_FIELDS = ["wifi", "ac", "free", "coffee", "outlets", "pastries", "open_24_7"]
+WEIGHTS = {"amenities": 0.35, "location": 0.35, "behaviour": 0.3}
+DISTANCE_SCALE_KM = 2.0
+# A handful of very active accounts would otherwise dominate the
+# co-visit counts (and cost quadratic time in their spot lists)
+MAX_SPOTS_PER_USER = 200
+EARTH_RADIUS_KM = 6371.0
+
+
+# ---------- FEATURES ----------
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _spot_features():
+    rows = list(StudySpot.objects.order_by("pk").values_list("pk", "lat", "lng", "average_rating", *AMENITY_FIELDS))
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    coordinates = np.array(
+        [(np.nan, np.nan) if row[1] is None or row[2] is None else (row[1], row[2]) for row in rows],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    amenities = np.array(
+        [[float(flag) for flag in row[4:]] + [float(row[3] or 0) / 5] for row in rows],
+        dtype=np.float32,
+    ).reshape(len(rows), len(AMENITY_FIELDS) + 1)
+    return ids, _normalize_rows(amenities), np.radians(coordinates)
+
+
+def _co_visits(ids):
+    """
+    Ordered (i, j) column pairs of spots that share a user, sorted by i,
+    plus each spot's number of distinct users.
+    """
+    column = {pk: i for i, pk in enumerate(ids.tolist())}
+    visits = set(CheckIn.objects.values_list("user_id", "spot_id").distinct())
+    visits.update(Review.objects.values_list("user_id", "spot_id").distinct())
+    visits = np.array(
+        sorted((user, column[spot]) for user, spot in visits if spot in column), dtype=np.int64,
+    ).reshape(-1, 2)
+
+    degree = np.bincount(visits[:, 1], minlength=len(ids)).astype(np.float32)
+    _, starts, counts = np.unique(visits[:, 0], return_index=True, return_counts=True)
+    pairs = []
+    for start, count in zip(starts[counts > 1], counts[counts > 1]):
+        spots = visits[start:start + min(count, MAX_SPOTS_PER_USER), 1]
+        i, j = np.meshgrid(spots, spots, indexing="ij")
+        keep = i != j
+        pairs.append(np.stack([i[keep], j[keep]], axis=1))
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+    return pairs[np.argsort(pairs[:, 0], kind="stable")], degree
+
+
+# ---------- SCORING ----------
+
+def _distance_kernel(block, coordinates):
+    lat1, lng1 = block[:, 0:1], block[:, 1:2]
+    lat2, lng2 = coordinates[:, 0], coordinates[:, 1]
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+    # Spots without coordinates get no location similarity
+    return np.nan_to_num(np.exp(-distance / DISTANCE_SCALE_KM), nan=0.0).astype(np.float32)
+
+
+def _behaviour_block(lo, hi, n, pairs, degree):
+    first, last = np.searchsorted(pairs[:, 0], [lo, hi])
+    counts = np.zeros((hi - lo, n), dtype=np.float32)
+    np.add.at(counts, (pairs[first:last, 0] - lo, pairs[first:last, 1]), 1)
+    norms = np.sqrt(np.outer(degree[lo:hi], degree))
+    return np.divide(counts, norms, out=np.zeros_like(counts), where=norms > 0)
+
+
+def neighbours(ids, amenities, coordinates, pairs, degree, k=TOP_K):
+    """Yield (spot_id, [(similar_id, score), ...]) with the k best neighbours of every spot."""
+    n = len(ids)
+    k = min(k, n - 1)
+    if k <= 0:
+        return
+    for lo in range(0, n, BLOCK_SIZE):
+        hi = min(lo + BLOCK_SIZE, n)
+        scores = WEIGHTS["amenities"] * (amenities[lo:hi] @ amenities.T)
+        scores += WEIGHTS["location"] * _distance_kernel(coordinates[lo:hi], coordinates)
+        scores += WEIGHTS["behaviour"] * _behaviour_block(lo, hi, n, pairs, degree)
+        scores[np.arange(hi - lo), np.arange(lo, hi)] = -np.inf  # not similar to itself
+
+        # Unordered top k per row, then order just those
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for row in range(hi - lo):
+            yield int(ids[lo + row]), [
+                (int(ids[col]), float(score))
+                for col, score in zip(top[row], top_scores[row])
+                if score > 0
+            ]
+
+
+def build():
+    """Recompute every spot's similar-spots list. Returns the number of rows stored."""
+    ids, amenities, coordinates = _spot_features()
+    pairs, degree = _co_visits(ids)
+
+    rows = [
+        SimilarSpot(spot_id=spot_id, similar_id=similar_id, rank=rank, score=round(score, 4))
+        for spot_id, similar in neighbours(ids, amenities, coordinates, pairs, degree)
+        for rank, (similar_id, score) in enumerate(similar, start=1)
+    ]
+    # Readers see either the old lists or the new ones, never a gap
+    with transaction.atomic():
+        SimilarSpot.objects.all().delete()
+        SimilarSpot.objects.bulk_create(rows, batch_size=INSERT_BATCH_SIZE)
+    return len(rows)
+
+
+# ---------- READING ----------
+
+def similar_to(spot_id, limit=TOP_K):
+    """The stored similar spots for one spot, best first, with one indexed query."""
+    return [
+        entry.similar
+        for entry in SimilarSpot.objects.filter(spot_id=spot_id)
+        .select_related("similar").order_by("rank")[:limit]
+    ]
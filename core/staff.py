@@ -0,0 +1,100 @@
+"""
+Staff application moderation.
+
+Approving or rejecting any number of applications costs a fixed handful of
+queries: the decided rows are read once, then applications, users and
+profiles are each changed with a single UPDATE. None of it goes through
+Model.save(), so no per-user signals fire. Applicants are emailed only
+after the transaction commits, and a failed email never undoes a decision.
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import StaffApplication, UserProfile
+
+PENDING = "Pending"
+APPROVED = "Approved"
+REJECTED = "Rejected"
+
+MESSAGES = {
+    APPROVED: (
+        "Your StudyHive staff application was approved",
+        "Hi {name},\n\nYour application for {place} was approved. You can now "
+        "add and manage study spot listings on StudyHive.\n",
+    ),
+    REJECTED: (
+        "Your StudyHive staff application",
+        "Hi {name},\n\nUnfortunately your application for {place} was not "
+        "approved. You are welcome to apply again with updated details.\n",
+    ),
+}
+
+
+def _decide(applications, status, from_statuses):
+    """Set `status` on the applications in the queryset currently in `from_statuses`."""
+    with transaction.atomic():
+        decided = list(
+            applications.filter(status__in=from_statuses)
+            .select_for_update()
+            .values("pk", "user_id", "email", "full_name", "study_place_name")
+        )
+        if not decided:
+            return []
+        StaffApplication.objects.filter(pk__in=[app["pk"] for app in decided]).update(status=status)
+        if status == APPROVED:
+            grant_staff([app["user_id"] for app in decided])
+        transaction.on_commit(lambda: notify(decided, status))
+    return decided
+
+
+def approve_applications(applications):
+    """
+    Approve pending (or previously rejected) applications and make their
+    users staff contributors. Returns how many changed.
+    """
+    return len(_decide(applications, APPROVED, [PENDING, REJECTED]))
+
+
+def reject_applications(applications):
+    """
+    Reject pending applications. Approved ones are left alone: that would
+    need staff access revoked too. Returns how many changed.
+    """
+    return len(_decide(applications, REJECTED, [PENDING]))
+
+
+def grant_staff(user_ids):
+    User.objects.filter(pk__in=user_ids).update(is_staff=True)
+
+    # UserProfile is a TrackedModel; bump what save() would have bumped
+    updated = UserProfile.objects.filter(user_id__in=user_ids).update(
+        is_contributor=True, version=F("version") + 1, updated_at=timezone.now(),
+    )
+    if updated < len(user_ids):
+        # Accounts from before profiles were created on sign-up
+        existing = set(UserProfile.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+        UserProfile.objects.bulk_create(
+            [UserProfile(user_id=pk, is_contributor=True) for pk in set(user_ids) - existing],
+            ignore_conflicts=True,
+        )
+
+
+def notify(applications, status):
+    subject, body = MESSAGES[status]
+    send_mass_mail(
+        [
+            (
+                subject,
+                body.format(name=app["full_name"], place=app["study_place_name"]),
+                settings.DEFAULT_FROM_EMAIL,
+                [app["email"]],
+            )
+            for app in applications
+        ],
+        fail_silently=True,
+    )
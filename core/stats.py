@@ -0,0 +1,67 @@
+"""
+Site-wide counters for the about and landing pages.
+
+Counters are stored in the SiteStatistic table and the whole set is cached
+as one dict, so a page reads every counter with a single cache hit instead
+of running COUNT/DISTINCT queries. The handlers in core/signals.py keep the
+rows current and `manage.py reconcile_site_stats` recomputes them nightly.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import SiteStatistic, StudySpot
+
+STUDY_SPOTS = "study_spots"
+ACTIVE_USERS = "active_users"
+CITIES = "cities"
+
+CACHE_KEY = "site-stats"
+
+# How each counter is computed from the live tables
+COUNTERS = {
+    STUDY_SPOTS: lambda: StudySpot.objects.count(),
+    ACTIVE_USERS: lambda: get_user_model().objects.filter(is_active=True).count(),
+    CITIES: lambda: StudySpot.objects.values("location").distinct().count(),
+}
+
+
+def _invalidate():
+    # Only drop the cached dict once the counter update is visible to others
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def get_site_stats():
+    """Return {counter: value} for every counter in COUNTERS."""
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        stats = dict(SiteStatistic.objects.values_list("key", "value"))
+        for key in COUNTERS.keys() - stats.keys():
+            stats[key] = recompute(key)
+        cache.set(CACHE_KEY, stats, settings.CACHE_TTL)
+    return stats
+
+
+def recompute(key):
+    """Recount one counter from the live tables and store it."""
+    value = COUNTERS[key]()
+    SiteStatistic.objects.update_or_create(key=key, defaults={"value": value})
+    _invalidate()
+    return value
+
+
+def increment(key, delta=1):
+    """Adjust a counter in place; seeds it from the live tables on first use."""
+    updated = SiteStatistic.objects.filter(key=key).update(value=F("value") + delta)
+    if not updated:
+        recompute(key)
+    else:
+        _invalidate()
+
+
+def reconcile():
+    """Recompute every counter. Returns the fresh values."""
+    return {key: recompute(key) for key in COUNTERS}
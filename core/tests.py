@@ -1,3 +1,1026 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import re
+import shutil
+import tempfile
+import zoneinfo
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .auth_backends import EmailOrUsernameBackend
+from .cache import LANDING_NAMESPACE, bump_version, get_version, landing_cache_key, spot_namespace
+from .management.commands import vendor_icons
+from .middleware import PIN_COOKIE, ReplicaPinningMiddleware, UserProfileMiddleware
+from . import exports, favorites, geocoding, hours, imports, metrics, ratelimit, routing, similarity, staff, stats, usernames
+from .models import (
+    CheckIn, GeocodeCacheEntry, OpeningHours, Review, SiteStatistic, SpecialHours, StaffApplication, StudySpot,
+    UserProfile,
+)
+from .routers import end_request, pin_to_primary
+
+
+@override_settings(REPLICA_DATABASES=["replica1", "replica2"])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.tokens = pin_to_primary(False)
+
+    def tearDown(self):
+        end_request(self.tokens)
+
+    def test_reads_go_to_a_replica(self):
+        self.assertIn(router.db_for_read(StudySpot), ["replica1", "replica2"])
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(router.db_for_write(StudySpot), "default")
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        router.db_for_write(StudySpot)
+        self.assertEqual(router.db_for_read(StudySpot), "default")
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_reads_use_primary_without_replicas(self):
+        self.assertEqual(router.db_for_read(StudySpot), "default")
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class ReplicaQueryTests(TransactionTestCase):
+    # Not TestCase: a read on the second connection must not wait on the
+    # first one's open test transaction
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.addCleanup(end_request, pin_to_primary(False))
+
+    def queries_per_alias(self, work):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            work()
+        return [q["sql"] for q in primary], [q["sql"] for q in replica]
+
+    def test_reads_run_on_the_replica(self):
+        primary, replica = self.queries_per_alias(lambda: list(StudySpot.objects.all()))
+        self.assertEqual(primary, [])
+        self.assertEqual(len(replica), 1)
+        self.assertIn('FROM "core_studyspot"', replica[0])
+
+    def test_reads_after_a_write_run_on_the_primary(self):
+        def work():
+            User.objects.create_user("student", "student@example.com", "pw")
+            list(StudySpot.objects.all())
+
+        primary, replica = self.queries_per_alias(work)
+        self.assertEqual(replica, [])
+        self.assertTrue(any('FROM "core_studyspot"' in sql for sql in primary))
+
+
+@override_settings(REPLICA_DATABASES=["replica1"], REPLICA_PIN_SECONDS=5)
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.read_from = None
+
+    def reading_view(self, request):
+        self.read_from = router.db_for_read(StudySpot)
+        return HttpResponse()
+
+    def writing_view(self, request):
+        router.db_for_write(StudySpot)
+        self.read_from = router.db_for_read(StudySpot)
+        return HttpResponse()
+
+    def test_get_reads_from_replica(self):
+        response = ReplicaPinningMiddleware(self.reading_view)(self.factory.get("/"))
+        self.assertEqual(self.read_from, "replica1")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_post_reads_from_primary(self):
+        ReplicaPinningMiddleware(self.reading_view)(self.factory.post("/"))
+        self.assertEqual(self.read_from, "default")
+
+    def test_write_pins_the_browser_to_primary(self):
+        response = ReplicaPinningMiddleware(self.writing_view)(self.factory.post("/"))
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        ReplicaPinningMiddleware(self.reading_view)(request)
+        self.assertEqual(self.read_from, "default")
+
+    def test_state_does_not_leak_between_requests(self):
+        ReplicaPinningMiddleware(self.writing_view)(self.factory.post("/"))
+        ReplicaPinningMiddleware(self.reading_view)(self.factory.get("/"))
+        self.assertEqual(self.read_from, "replica1")
+
+
+class UserProfileSignalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+
+    def test_profile_created_with_user(self):
+        self.assertTrue(UserProfile.objects.filter(user=self.user).exists())
+
+    def test_login_does_not_touch_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post("/login/", {"username": "student", "password": "pw"})
+        self.assertFalse(any("core_userprofile" in q["sql"] for q in queries.captured_queries))
+
+    def test_middleware_loads_the_profile_only_when_used(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+        middleware = UserProfileMiddleware(lambda request: HttpResponse())
+        with self.assertNumQueries(0):
+            middleware(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(request.profile.user_id, self.user.pk)
+            self.assertIs(request.profile.user, request.user)
+
+    def test_user_without_profile_can_be_saved(self):
+        UserProfile.objects.filter(user=self.user).delete()
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = "Alex"
+        user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).first_name, "Alex")
+        self.assertFalse(UserProfile.objects.filter(user=self.user).exists())
+
+        # request.profile puts the missing row back when it is first used
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/profile/manage/").status_code, 200)
+        self.assertTrue(UserProfile.objects.filter(user=self.user).exists())
+
+
+class ManageProfileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            "student", "student@example.com", "pw", first_name="Alex", last_name="Cruz",
+        )
+        UserProfile.objects.filter(user=self.user).update(full_name="Alex  Cruz", bio="Hi")
+        self.client.force_login(self.user)
+        self.form = {
+            "first_name": "Alex", "last_name": "Cruz", "username": "student",
+            "email": "student@example.com", "middle_initial": "", "phone_number": "", "bio": "Hi",
+        }
+
+    def post(self, **changes):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/profile/manage/", {**self.form, **changes})
+        self.assertRedirects(response, "/profile/", fetch_redirect_response=False)
+        return [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+
+    def test_unchanged_form_writes_nothing(self):
+        self.assertEqual(self.post(), [])
+
+    def test_preferences_do_not_rewrite_the_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post("/update-preferences/", {"email_notifications": "on", "profile_visibility": "private"})
+        self.assertFalse(any("core_userprofile" in q["sql"] and q["sql"].startswith("UPDATE") for q in queries))
+
+    def test_only_changed_fields_are_saved(self):
+        user_update, profile_update = self.post(first_name="Sam")
+        self.assertIn('"first_name"', user_update)
+        self.assertNotIn('"email"', user_update)
+        self.assertIn('"full_name"', profile_update)
+        self.assertNotIn('"bio"', profile_update)
+        self.assertEqual(User.objects.get(pk=self.user.pk).first_name, "Sam")
+        self.assertEqual(UserProfile.objects.get(user=self.user).full_name, "Sam  Cruz")
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        StudySpot.objects.create(owner=owner, name="Library", location="Cebu", description="Quiet")
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        response = self.client.get("/")
+        timing = response["Server-Timing"]
+        for metric in ("db;dur=", "tpl;dur=", "storage;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+
+    @override_settings(DEBUG=False, SERVER_TIMING_HEADER=False)
+    def test_server_timing_header_is_opt_in(self):
+        self.assertNotIn("Server-Timing", self.client.get("/"))
+
+    def test_fast_requests_log_at_debug(self):
+        with self.assertLogs("core.requests", "DEBUG") as logs:
+            self.client.get("/")
+        self.assertEqual([record.levelname for record in logs.records], ["DEBUG"])
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_QUERY_COUNT=2)
+    def test_slow_request_logs_slowest_queries(self):
+        with self.assertLogs("core.requests", "WARNING") as logs:
+            self.client.get("/")
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "core:landing")
+        self.assertGreater(record["db_queries"], 0)
+        self.assertGreater(record["template_ms"], 0)
+        self.assertEqual(len(record["slow_queries"]), min(2, record["db_queries"]))
+        self.assertTrue(all(q["origin"] for q in record["slow_queries"]))
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsViewTests(TestCase):
+    def test_requires_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    def test_reports_requests_and_active_checkins(self):
+        self.client.get("/")
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        body = response.content.decode()
+        self.assertIn('studyhive_request_duration_seconds_count{method="GET",view="core:landing"}', body)
+        self.assertIn("studyhive_active_checkins 0.0", body)
+
+
+class StaffApprovalTests(TestCase):
+    def setUp(self):
+        self.applications = []
+        for i in range(3):
+            user = User.objects.create_user(f"applicant{i}", f"applicant{i}@example.com", "pw")
+            self.applications.append(StaffApplication.objects.create(
+                user=user, full_name=f"Applicant {i}", email=user.email, phone_number="0917",
+                study_place_name=f"Cafe {i}", study_place_address="Cebu", role_description="Owner",
+            ))
+
+    def test_approval_is_set_based(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(6):  # savepoint, read, 3 updates, release
+                count = staff.approve_applications(StaffApplication.objects.all())
+
+        self.assertEqual(count, 3)
+        self.assertEqual(User.objects.filter(is_staff=True).count(), 3)
+        self.assertEqual(UserProfile.objects.filter(is_contributor=True).count(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_decided_applications_are_skipped(self):
+        staff.approve_applications(StaffApplication.objects.filter(pk=self.applications[0].pk))
+        self.assertEqual(staff.reject_applications(StaffApplication.objects.all()), 2)
+        self.assertEqual(User.objects.filter(is_staff=True).count(), 1)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        StudySpot.objects.create(owner=owner, name='Cafe "One"', location="Cebu", description="x", lat=10.3)
+        StudySpot.objects.create(owner=owner, name="Library", location="Cebu", description="y")
+
+    def test_csv_streams_header_and_rows(self):
+        response = exports.streaming_export(StudySpot.objects.all(), "csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "name", "location"])
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"Cafe ""One"""', lines[1])
+
+    def test_ndjson_one_object_per_line(self):
+        response = exports.streaming_export(StudySpot.objects.all(), "ndjson")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["name"] for row in rows], ['Cafe "One"', "Library"])
+        self.assertEqual(rows[0]["owner"], "owner")
+        self.assertIsNone(rows[1]["lat"])
+
+
+class SpotImportTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("partner", "partner@example.com", "pw")
+        StudySpot.objects.create(
+            owner=self.owner, name="Rizal Library", location="Cebu", description="x", lat=10.3, lng=123.9,
+        )
+
+    def run_csv(self, text):
+        return imports.import_spots(imports.read_csv(io.BytesIO(text.encode())), self.owner)
+
+    def test_csv_import_validates_and_dedupes(self):
+        report = self.run_csv(
+            "name,location,description,wifi,lat,lng,opening_time,closing_time\n"
+            "Bean There,IT Park,Cafe,yes,10.33,123.91,08:00,20:00\n"
+            "bean  there!,IT Park,Same place,no,10.33001,123.91002,,\n"  # duplicate in file
+            "RIZAL LIBRARY,Cebu,Already stored,,10.3,123.9,,\n"
+            ",Nowhere,Missing name,,,,,\n"
+            "Half Coordinates,Cebu,x,,10.1,,,\n"
+        )
+        self.assertEqual((report["created"], report["duplicates"], report["invalid"]), (1, 2, 2))
+        self.assertEqual([e["row"] for e in report["errors"]], [4, 5])
+        spot = StudySpot.objects.get(name="Bean There")
+        self.assertTrue(spot.wifi)
+        self.assertEqual(spot.owner, self.owner)
+
+    def test_geojson_import(self):
+        document = {"type": "FeatureCollection", "features": [{
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [123.95, 10.31]},
+            "properties": {"name": "Harbor Hub", "location": "Mandaue", "description": "x", "open_24_7": True},
+        }]}
+        report = imports.import_spots(imports.read_geojson(io.BytesIO(json.dumps(document).encode())), self.owner)
+        self.assertEqual(report["created"], 1)
+        spot = StudySpot.objects.get(name="Harbor Hub")
+        self.assertEqual((spot.lat, spot.lng, spot.open_24_7), (10.31, 123.95, True))
+
+
+    def test_unreadable_files_raise_value_error(self):
+        bad_files = [
+            (imports.read_csv, b"name,location\nCafe,Cebu,extra\n"),
+            (imports.read_csv, b"name\n" + b"x" * (csv.field_size_limit() + 1) + b"\n"),
+            (imports.read_csv, "name\nCaf\u00e9\n".encode("latin-1")),
+            (imports.read_geojson, b"{not json"),
+            (imports.read_geojson, b"[1, 2]"),
+            (imports.read_geojson, b'{"features": {"type": "Feature"}}'),
+            (imports.read_geojson, b'{"features": ["Feature"]}'),
+            (imports.read_geojson, b'{"features": [{"geometry": {"type": "Point"}}]}'),
+            (imports.read_geojson, b'{"features": [{"geometry": {"type": "Point", "coordinates": [1]}}]}'),
+        ]
+        for reader, content in bad_files:
+            with self.subTest(content=content), self.assertRaises(ValueError):
+                imports.import_spots(reader(io.BytesIO(content)), self.owner)
+        self.assertEqual(StudySpot.objects.count(), 1)
+
+class CountingGazetteer(geocoding.GazetteerGeocoder):
+    calls = 0
+
+    def forward(self, address):
+        CountingGazetteer.calls += 1
+        return super().forward(address)
+
+
+@override_settings(GEOCODER="core.tests.CountingGazetteer")
+class GeocodingTests(TestCase):
+    def setUp(self):
+        CountingGazetteer.calls = 0
+
+    def test_repeated_addresses_cost_one_lookup(self):
+        results = geocoding.geocode_many(["IT Park, Lahug", "it park,  LAHUG", "Atlantis"])
+        self.assertEqual(results["IT Park, Lahug"], results["it park,  LAHUG"])
+        self.assertAlmostEqual(results["IT Park, Lahug"].lat, 10.3305)
+        self.assertIsNone(results["Atlantis"])
+        self.assertEqual(CountingGazetteer.calls, 2)
+
+        # Hits and cached misses both come from the table
+        geocoding.geocode_many(["IT PARK lahug", "Atlantis"])
+        self.assertEqual(CountingGazetteer.calls, 2)
+        self.assertEqual(GeocodeCacheEntry.objects.count(), 2)
+
+    def test_backfill_missing_coordinates(self):
+        owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        for name in ("A", "B"):
+            StudySpot.objects.create(owner=owner, name=name, location="Banilad", description="x")
+        call_command("backfill_coordinates", stdout=io.StringIO())
+        self.assertFalse(StudySpot.objects.filter(lat__isnull=True).exists())
+        self.assertEqual(CountingGazetteer.calls, 1)
+
+    def test_parse_coordinates(self):
+        self.assertEqual(geocoding.parse_coordinates("10.3", "123.9"), (10.3, 123.9))
+        for lat, lng in [("", ""), ("undefined", "1"), ("91", "0"), ("nan", "0"), (None, None)]:
+            self.assertIsNone(geocoding.parse_coordinates(lat, lng))
+
+    def test_listings_only_use_cached_addresses(self):
+        owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        UserProfile.objects.filter(user=owner).update(is_contributor=True)
+        geocoding.geocode("IT Park, Lahug")
+        self.client.force_login(owner)
+        for name, location in (("Known", "it park lahug"), ("New", "Banilad")):
+            self.client.post("/create-listing/", {"name": name, "location": location, "description": "x"})
+        self.assertEqual(CountingGazetteer.calls, 1)
+        self.assertAlmostEqual(StudySpot.objects.get(name="Known").lat, 10.3305)
+        self.assertIsNone(StudySpot.objects.get(name="New").lat)
+
+
+@override_settings(ROUTER="core.routing.StraightLineRouter", ROUTE_CACHE_SIZE=2)
+class RouteDirectionsTests(TestCase):
+    def setUp(self):
+        routing.route_cache.clear()
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def test_simplify_drops_collinear_points(self):
+        line = [[10.0, 123.0 + i / 1000] for i in range(50)] + [[10.01, 123.049]]
+        self.assertEqual(len(routing.simplify(line, 5)), 3)
+
+    def test_nearby_requests_share_a_cached_route(self):
+        first = self.client.get("/api/route/", {"from": "10.2946,123.8811", "to": "10.3305,123.9058"}).json()
+        second = self.client.get("/api/route/", {"from": "10.2948,123.8809", "to": "10.3305,123.9058"}).json()
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(first["coordinates"], second["coordinates"])
+        self.assertEqual(len(first["coordinates"]), 2)  # straight line after simplification
+
+    def test_cache_evicts_least_recently_used(self):
+        for i in range(3):
+            routing.find_route((10.0, 123.0), (10.1 + i / 10, 123.1))
+        self.assertFalse(routing.find_route((10.0, 123.0), (10.1, 123.1))[1])
+        self.assertTrue(routing.find_route((10.0, 123.0), (10.3, 123.1))[1])
+
+    def test_rejects_bad_coordinates(self):
+        response = self.client.get("/api/route/", {"from": "abc", "to": "10.3,123.9"})
+        self.assertEqual(response.status_code, 400)
+
+
+MANILA = zoneinfo.ZoneInfo("Asia/Manila")
+MONDAY = date(2026, 10, 19)
+
+
+def manila(hour, minute=0, day=MONDAY):
+    return datetime.combine(day, time(hour, minute), MANILA)
+
+
+class OpeningHoursTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pw")
+
+    def spot(self, **kwargs):
+        return StudySpot.objects.create(owner=self.owner, name="Spot", location="Cebu", description="x", **kwargs)
+
+    def assertOpen(self, spot, when, expected):
+        # The SQL annotation and the Python evaluation must agree
+        in_db = hours.annotate_open(StudySpot.objects.filter(pk=spot.pk), when).get().is_open
+        in_python = hours.status_at(StudySpot.objects.get(pk=spot.pk), when)[0]
+        self.assertEqual((in_db, in_python), (expected, expected), f"{spot} at {when}")
+
+    def test_overnight_and_half_set_hours(self):
+        night = self.spot(opening_time=time(18), closing_time=time(2))
+        self.assertOpen(night, manila(1), True)
+        self.assertOpen(night, manila(3), False)
+        self.assertOpen(night, manila(19), True)
+        closing_only = self.spot(closing_time=time(17))
+        self.assertOpen(closing_only, manila(10), True)
+        self.assertOpen(closing_only, manila(18), False)
+
+    def test_weekly_rows_and_special_dates_override(self):
+        spot = self.spot(opening_time=time(8), closing_time=time(17))
+        OpeningHours.objects.create(spot=spot, weekday=6)  # closed on Sundays
+        SpecialHours.objects.create(spot=spot, date=MONDAY + timedelta(days=1), opens=time(10), closes=time(12))
+        self.assertOpen(spot, manila(9), True)
+        self.assertOpen(spot, manila(9, day=MONDAY - timedelta(days=1)), False)
+        self.assertOpen(spot, manila(9, day=MONDAY + timedelta(days=1)), False)
+        self.assertOpen(spot, manila(11, day=MONDAY + timedelta(days=1)), True)
+
+        always = self.spot(open_24_7=True)
+        SpecialHours.objects.create(spot=always, date=MONDAY)  # holiday
+        self.assertOpen(always, manila(12), False)
+        self.assertOpen(always, manila(12, day=MONDAY + timedelta(days=1)), True)
+
+    def test_hours_are_read_in_the_spots_time_zone(self):
+        london = self.spot(opening_time=time(9), closing_time=time(17), time_zone="Europe/London")
+        self.assertOpen(london, manila(18), True)  # 11:00 in London
+        self.assertOpen(london, manila(10), False)  # 03:00 in London
+
+    def test_next_change_is_maintained_and_closing_checks_out(self):
+        spot = self.spot(opening_time=time(8), closing_time=time(17))
+        self.assertIsNotNone(StudySpot.objects.get(pk=spot.pk).next_status_change_at)
+        self.assertEqual(hours.status_at(spot, manila(10)), (True, manila(17)))
+        self.assertEqual(hours.status_at(spot, manila(18)), (False, manila(8, day=MONDAY + timedelta(days=1))))
+
+        checkin = CheckIn.objects.create(user=self.owner, spot=spot)
+        hours.refresh([spot], manila(10))
+        self.assertEqual(hours.refresh_due(manila(16)), (0, 0))
+        self.assertEqual(hours.refresh_due(manila(17, 1)), (1, 0))
+        self.assertTrue(CheckIn.objects.get(pk=checkin.pk).is_active)
+        self.assertEqual(StudySpot.objects.get(pk=spot.pk).next_status_change_at, manila(8, day=MONDAY + timedelta(days=1)))
+
+    @override_settings(AUTO_CHECKOUT_ON_CLOSE=True)
+    def test_closing_checks_out_like_the_toggle(self):
+        cache.clear()
+        spot = self.spot(opening_time=time(8), closing_time=time(17))
+        checkin = CheckIn.objects.create(user=self.owner, spot=spot)
+        hours.refresh([spot], manila(10))
+        spot_version = get_version(spot_namespace(spot.pk))
+        toggles = metrics.CHECKIN_TOGGLES.labels("closing")._value.get()
+
+        self.assertEqual(hours.refresh_due(manila(17, 1)), (1, 1))
+        checkin = CheckIn.objects.get(pk=checkin.pk)
+        self.assertEqual((checkin.is_active, checkin.version), (False, 2))
+        self.assertGreater(get_version(spot_namespace(spot.pk)), spot_version)
+        self.assertEqual(metrics.CHECKIN_TOGGLES.labels("closing")._value.get(), toggles + 1)
+
+    def test_pages_do_not_write(self):
+        spot = self.spot()
+        SpecialHours.objects.create(spot=spot, date=timezone.localdate(timezone=MANILA))
+        StudySpot.objects.filter(pk=spot.pk).update(next_status_change_at=timezone.now() - timedelta(hours=1))
+        CheckIn.objects.create(user=self.owner, spot=spot)
+        self.client.force_login(self.owner)
+
+        # refresh_opening_hours does both on its schedule
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/map_view/")
+            self.client.get(f"/spot/{spot.pk}/")
+            status = self.client.get(f"/api/spots/status/?ids={spot.pk}").json()["spots"][str(spot.pk)]
+        self.assertFalse(status["open"])
+        self.assertEqual([q["sql"] for q in queries if q["sql"].startswith("UPDATE")], [])
+        self.assertTrue(CheckIn.objects.get(spot=spot).is_active)
+
+    def test_check_in_refused_while_closed(self):
+        spot = self.spot()
+        SpecialHours.objects.create(spot=spot, date=timezone.localdate(timezone=MANILA))
+        self.client.force_login(self.owner)
+        self.client.post(f"/spot/{spot.pk}/toggle-checkin/")
+        self.assertFalse(CheckIn.objects.filter(spot=spot).exists())
+        self.assertTrue(StudySpot.objects.get(pk=spot.pk).is_closed)
+
+
+class FavoriteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        self.spot = StudySpot.objects.create(owner=self.user, name="Hub", location="Cebu", description="x")
+        self.client.force_login(self.user)
+        self.url = f"/api/spots/{self.spot.pk}/favorite/"
+
+    def test_add_and_remove_are_idempotent(self):
+        self.client.post(self.url)
+        response = self.client.post(self.url).json()
+        self.assertEqual(response, {"favorited": True, "favorite_count": 1})
+        self.assertEqual(self.client.delete(self.url).json()["favorite_count"], 0)
+        self.assertEqual(self.client.delete(self.url).json()["favorite_count"], 0)
+
+    def test_favorite_ids_are_cached_until_changed(self):
+        favorites.add_favorite(self.user, self.spot)
+        self.assertEqual(favorites.favorite_ids(self.user), {self.spot.pk})
+        with self.assertNumQueries(0):
+            favorites.favorite_ids(self.user)
+        favorites.remove_favorite(self.user, self.spot)
+        self.assertEqual(favorites.favorite_ids(self.user), set())
+
+        response = self.client.get("/settings/")
+        self.assertEqual(response.context["favorite_spaces"], 0)
+
+    def test_recount_repairs_drift(self):
+        favorites.add_favorite(self.user, self.spot)
+        StudySpot.objects.filter(pk=self.spot.pk).update(favorite_count=7)
+        self.assertEqual(favorites.recount(), 1)
+        self.assertEqual(StudySpot.objects.get(pk=self.spot.pk).favorite_count, 1)
+
+
+class SimilarSpotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+
+        def spot(name, lat, lng, **amenities):
+            return StudySpot.objects.create(
+                owner=self.user, name=name, location="Cebu", description="x", lat=lat, lng=lng, **amenities,
+            )
+
+        self.cafe = spot("Cafe", 10.300, 123.890, wifi=True, coffee=True)
+        self.twin = spot("Twin", 10.301, 123.891, wifi=True, coffee=True)
+        self.library = spot("Library", 10.330, 123.950, ac=True)
+        self.annex = spot("Annex", 10.500, 124.100, ac=True)
+        # Students who study at the library also study at the annex
+        for name in ["a", "b"]:
+            student = User.objects.create_user(name, f"{name}@example.com", "pw")
+            Review.objects.create(spot=self.library, user=student, rating=5)
+            Review.objects.create(spot=self.annex, user=student, rating=4)
+
+    def test_build_ranks_neighbours(self):
+        self.assertEqual(similarity.build(), 12)
+        with self.assertNumQueries(1):
+            self.assertEqual(similarity.similar_to(self.cafe.pk)[0], self.twin)
+        self.assertEqual(similarity.similar_to(self.annex.pk)[0], self.library)
+
+    def test_pages_read_the_stored_lists(self):
+        similarity.build()
+        self.client.force_login(self.user)
+        response = self.client.get(f"/spot/{self.cafe.pk}/")
+        self.assertEqual(response.context["similar_spots"][0], self.twin)
+        spots = self.client.get(f"/api/spots/{self.cafe.pk}/similar/").json()["spots"]
+        self.assertEqual([item["name"] for item in spots][:1], ["Twin"])
+
+
+class StaticPipelineTests(SimpleTestCase):
+    def setUp(self):
+        self.source = Path(tempfile.mkdtemp())
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.source / "css").mkdir()
+        (self.source / "css" / "app.css").write_text("/* theme */\n.spot {\n  background: url('../bg.png');\n}\n")
+        (self.source / "app.js").write_text("// boot\nfunction hello(name) {\n  return `hi ${name}`;\n}\n" * 20)
+        (self.source / "bg.png").write_bytes(b"\x89PNG")
+
+    def test_collectstatic_minifies_hashes_and_compresses(self):
+        with override_settings(
+            STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATIC_ROOT=self.root,
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "core.storage.MinifiedManifestStaticFilesStorage"},
+            },
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            manifest = json.loads((self.root / "staticfiles.json").read_text())["paths"]
+
+        css = (self.root / manifest["css/app.css"]).read_text()
+        self.assertNotIn("theme", css)
+        self.assertIn(manifest["bg.png"], css)
+        js = (self.root / manifest["app.js"]).read_text()
+        self.assertNotIn("boot", js)
+        self.assertIn("function hello(name){return`hi ${name}`;}", js)
+        self.assertTrue((self.root / (manifest["app.js"] + ".gz")).exists())
+
+    def test_vendored_icons_cover_the_templates(self):
+        # Fails after a new icon is used without rerunning `manage.py vendor_icons`
+        css = (vendor_icons.OUTPUT_DIR / "css" / "fontawesome.css").read_text(encoding="utf-8")
+        icons = set(re.findall(r"\.fa-([a-z0-9-]+)::?before", css))
+        missing = vendor_icons.used_classes() - icons - vendor_icons.Command().utility_classes(css)
+        self.assertEqual(missing, set())
+
+
+@override_settings(RATELIMIT_ENABLED=True, RATELIMIT_PROXY_COUNT=1)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def test_client_ip_without_forwarded_header(self):
+        request = self.factory.get("/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(ratelimit.client_ip(request), "10.0.0.1")
+
+    def test_client_ip_is_the_address_the_proxy_appended(self):
+        # The first hop was written by the client and cannot be trusted
+        request = self.factory.get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6, 203.0.113.7")
+        self.assertEqual(ratelimit.client_ip(request), "203.0.113.7")
+
+    @override_settings(RATELIMIT_PROXY_COUNT=0)
+    def test_client_ip_ignores_forwarded_header_without_proxies(self):
+        request = self.factory.get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.7")
+        self.assertEqual(ratelimit.client_ip(request), "10.0.0.1")
+
+    def test_login_is_limited_per_account(self):
+        for _ in range(10):
+            self.assertEqual(self.client.post("/login/", {"username": "victim", "password": "x"}).status_code, 200)
+        response = self.client.post("/login/", {"username": "Victim ", "password": "x"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    def test_visitors_behind_the_proxy_have_separate_limits(self):
+        view = ratelimit.rate_limit("test", limit=1, window=60, methods=("GET",))(lambda request: HttpResponse("ok"))
+        first = self.factory.get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.7")
+        other = self.factory.get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.8")
+        self.assertEqual(view(first).status_code, 200)
+        self.assertEqual(view(other).status_code, 200)
+        self.assertEqual(view(first).status_code, 429)
+
+    def test_json_views_get_a_json_429(self):
+        view = ratelimit.rate_limit("test", limit=1, window=60, methods=("GET",), json=True)(
+            lambda request: HttpResponse("ok")
+        )
+        view(self.factory.get("/", REMOTE_ADDR="10.0.0.1"))
+        response = view(self.factory.get("/", REMOTE_ADDR="10.0.0.1"))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("error", json.loads(response.content))
+
+
+class EmailOrUsernameBackendTests(TestCase):
+    def setUp(self):
+        self.backend = EmailOrUsernameBackend()
+        self.user = User.objects.create_user("Student", "Student@Example.com", "pw")
+
+    def test_matches_username_and_email_case_insensitively(self):
+        for login in ("student", "STUDENT", " Student ", "student@example.com", "STUDENT@EXAMPLE.COM"):
+            self.assertEqual(self.backend.authenticate(None, username=login, password="pw"), self.user)
+
+    def test_username_wins_over_another_accounts_email(self):
+        User.objects.create_user("someone", "student", "pw2")
+        self.assertEqual(self.backend.authenticate(None, username="student", password="pw"), self.user)
+        self.assertIsNone(self.backend.authenticate(None, username="student", password="pw2"))
+
+    def test_exact_username_wins_over_case_insensitive_one(self):
+        exact = User.objects.create_user("student", "other@example.com", "pw3")
+        self.assertEqual(self.backend.authenticate(None, username="student", password="pw3"), exact)
+
+    def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.authenticate(None, username="student", password="pw"))
+
+    def test_wrong_password_is_rejected(self):
+        self.assertIsNone(self.backend.authenticate(None, username="student", password="nope"))
+
+    def test_unknown_login_still_hashes_the_password(self):
+        with mock.patch.object(User, "set_password", autospec=True) as set_password:
+            self.assertIsNone(self.backend.authenticate(None, username="nobody", password="pw"))
+        set_password.assert_called_once_with(mock.ANY, "pw")
+
+    def test_failed_login_costs_one_query(self):
+        for login in ("student", "nobody"):
+            with self.subTest(login=login), self.assertNumQueries(1):
+                self.assertIsNone(authenticate(None, username=login, password="nope"))
+
+    def test_duplicate_emails_pick_the_oldest_account(self):
+        User.objects.create_user("twin", "student@example.com", "pw")
+        self.assertEqual(self.backend.authenticate(None, username="student@example.com", password="pw"), self.user)
+
+
+class UsernameIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.index = usernames.UsernameIndex()
+        self.user = User.objects.create_user("Taken", "taken@example.com", "pw")
+        self.now = 1000.0
+        patcher = mock.patch("core.usernames.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = usernames.BloomFilter(capacity=1000)
+        names = [f"user{i}" for i in range(1000)]
+        for name in names:
+            bloom.add(name)
+        self.assertTrue(all(name in bloom for name in names))
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_taken_is_case_insensitive(self):
+        self.assertEqual(self.index.taken(["TAKEN", "free"]), {"taken"})
+
+    def test_refresh_picks_up_users_from_other_workers(self):
+        self.index.taken(["x"])
+        # bulk_create skips the signal that tells this worker's index
+        User.objects.bulk_create([User(username="elsewhere")])
+        self.assertEqual(self.index.taken(["elsewhere"]), set())
+        self.now += usernames.REFRESH_SECONDS
+        self.assertEqual(self.index.taken(["elsewhere"]), {"elsewhere"})
+
+    def test_rebuild_picks_up_renames(self):
+        self.index.taken(["x"])
+        User.objects.filter(pk=self.user.pk).update(username="renamed")
+        self.now += usernames.REFRESH_SECONDS
+        self.assertEqual(self.index.taken(["renamed"]), set())
+        self.now += usernames.REBUILD_SECONDS
+        self.assertEqual(self.index.taken(["renamed"]), {"renamed"})
+
+    def test_saves_in_other_workers_are_seen_at_once(self):
+        self.index.taken(["x"])
+        # The signal only adds to this process's shared username_index
+        User.objects.create_user("newcomer", "newcomer@example.com", "pw")
+        self.user.username = "Renamed"
+        self.user.save(update_fields=["username"])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.index.taken(["newcomer", "renamed", "free"]), {"newcomer", "renamed"})
+
+    def test_evicted_saves_force_a_rebuild(self):
+        self.index.taken(["x"])
+        User.objects.create_user("newcomer", "newcomer@example.com", "pw")
+        cache.delete(usernames._saved_key(get_version(usernames.USERNAMES_NAMESPACE)))
+        self.assertEqual(self.index.taken(["newcomer"]), {"newcomer"})
+
+    def test_suggestions_are_free_and_valid(self):
+        User.objects.create_user("taken1", "t1@example.com", "pw")
+        long_name = "a" * 150
+        suggestions = usernames.suggest_alternatives(["taken", long_name, "two words"])
+        self.assertEqual(suggestions["taken"], ["taken2", "taken3", "taken4"])
+        self.assertTrue(all(len(name) <= 150 for name in suggestions[long_name]))
+        self.assertEqual(suggestions["two words"], [])
+
+
+class CheckUsernameTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        for name in ("alpha", "alpha1", "beta", "gamma"):
+            User.objects.create_user(name, f"{name}@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def post(self, payload):
+        return self.client.post("/api/check-username/", json.dumps(payload), content_type="application/json")
+
+    def test_batch_resolves_suggestions_with_one_lookup(self):
+        self.post({"username": "warm-up"})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post({"usernames": ["alpha", "Beta", "gamma", "free", "student"]})
+        results = {r["username"]: r for r in response.json()["results"]}
+        self.assertFalse(results["Beta"]["is_available"])
+        self.assertEqual(results["alpha"]["suggestions"], ["alpha2", "alpha3", "alpha4"])
+        self.assertTrue(results["free"]["is_available"])
+        self.assertTrue(results["student"]["is_available"])
+        # One to confirm the taken names, one for all their alternatives
+        lookups = [q for q in queries.captured_queries if "auth_user" in q["sql"] and " IN (" in q["sql"]]
+        self.assertEqual(len(lookups), 2)
+
+    def test_usernames_must_be_a_list(self):
+        response = self.post({"usernames": "alpha"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TrackedModelTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        self.spot = StudySpot.objects.create(owner=self.owner, name="Library", location="Cebu", description="Quiet")
+
+    def test_save_bumps_version_and_updated_at(self):
+        before = self.spot.updated_at
+        self.spot.name = "Main Library"
+        self.spot.save(update_fields=["name"])
+        self.assertEqual(self.spot.version, 2)
+        spot = StudySpot.objects.get(pk=self.spot.pk)
+        self.assertEqual((spot.version, spot.name), (2, "Main Library"))
+        self.assertGreater(spot.updated_at, before)
+
+    def test_save_does_not_read_the_version_back(self):
+        with self.assertNumQueries(1):
+            self.spot.save(update_fields=["name"])
+        # Loaded on first access
+        self.assertEqual(self.spot.version, 2)
+
+    def test_post_save_receivers_see_the_new_version(self):
+        seen = []
+
+        def receiver(sender, instance, **kwargs):
+            seen.append(instance.version)
+
+        post_save.connect(receiver, sender=StudySpot)
+        self.addCleanup(post_save.disconnect, receiver, sender=StudySpot)
+        self.spot.save()
+        self.assertEqual(seen, [2])
+
+    def test_failed_save_keeps_the_version(self):
+        with self.assertRaises(ValueError):
+            self.spot.save(update_fields=["no_such_field"])
+        self.assertEqual(self.spot.version, 1)
+
+    def test_stale_instances_do_not_reuse_a_version(self):
+        first = StudySpot.objects.get(pk=self.spot.pk)
+        second = StudySpot.objects.get(pk=self.spot.pk)
+        first.description = "Loud"
+        first.save()
+        self.assertEqual(first.version, 2)
+        second.name = "Annex"
+        second.save(update_fields=["name"])
+        self.assertEqual(second.version, 3)
+        self.assertEqual(StudySpot.objects.get(pk=self.spot.pk).version, 3)
+
+    def test_changed_since(self):
+        other = StudySpot.objects.create(owner=self.owner, name="Cafe", location="Cebu", description="Busy")
+        since = timezone.now()
+        self.assertEqual(list(StudySpot.objects.changed_since(since)), [])
+        self.spot.save()
+        other.save()
+        self.assertEqual(list(StudySpot.objects.changed_since(since)), [self.spot, other])
+
+
+class SiteStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pw")
+
+    def spot(self, location="Cebu"):
+        return StudySpot.objects.create(owner=self.owner, name="Spot", location=location, description="x")
+
+    def counters(self):
+        return dict(SiteStatistic.objects.values_list("key", "value"))
+
+    def test_counters_follow_spots_and_users(self):
+        self.spot()
+        self.spot()
+        moved = self.spot("Mandaue")
+        User.objects.create_user("student", "student@example.com", "pw")
+        self.assertEqual(self.counters(), {stats.STUDY_SPOTS: 3, stats.CITIES: 2, stats.ACTIVE_USERS: 2})
+
+        moved.location = "Cebu"
+        moved.save()
+        self.assertEqual(self.counters()[stats.CITIES], 1)
+        moved.delete()
+        self.assertEqual(self.counters(), {stats.STUDY_SPOTS: 2, stats.CITIES: 1, stats.ACTIVE_USERS: 2})
+
+    def test_cities_recounted_only_when_location_changes(self):
+        created = self.spot()
+        loaded = StudySpot.objects.get(pk=created.pk)
+        with mock.patch.object(stats, "recompute", wraps=stats.recompute) as recompute:
+            created.name = "Renamed"
+            created.save()
+            loaded.update_average_rating()
+            loaded.location = "Cebu"
+            loaded.save()
+            recompute.assert_not_called()
+
+            loaded.location = "Mandaue"
+            loaded.save()
+            loaded.save()
+            recompute.assert_called_once_with(stats.CITIES)
+
+    def test_cached_stats_dropped_after_commit(self):
+        self.spot()
+        self.assertEqual(stats.get_site_stats()[stats.STUDY_SPOTS], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.spot("Mandaue")
+            # Other requests keep the old numbers until the transaction commits
+            self.assertEqual(stats.get_site_stats()[stats.STUDY_SPOTS], 1)
+        self.assertEqual(stats.get_site_stats()[stats.STUDY_SPOTS], 2)
+
+    def test_reconcile_repairs_drifted_counters(self):
+        self.spot()
+        SiteStatistic.objects.update(value=99)
+        expected = {stats.STUDY_SPOTS: 1, stats.CITIES: 1, stats.ACTIVE_USERS: 1}
+        self.assertEqual(stats.reconcile(), expected)
+        self.assertEqual(self.counters(), expected)
+
+
+class CacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        self.spot = StudySpot.objects.create(owner=self.owner, name="Library", location="Cebu", description="x")
+        self.other = StudySpot.objects.create(owner=self.owner, name="Cafe", location="Cebu", description="x")
+
+    def versions(self):
+        return {
+            "landing": get_version(LANDING_NAMESPACE),
+            "spot": get_version(spot_namespace(self.spot.pk)),
+            "other": get_version(spot_namespace(self.other.pk)),
+        }
+
+    def assertBumped(self, before, *namespaces):
+        after = self.versions()
+        self.assertEqual({name for name in after if after[name] != before[name]}, set(namespaces))
+
+    def test_spot_save_and_delete_bump_landing_and_spot(self):
+        before, key = self.versions(), landing_cache_key("", "all", "default")
+        self.spot.name = "Main Library"
+        self.spot.save()
+        self.assertBumped(before, "landing", "spot")
+        self.assertNotEqual(landing_cache_key("", "all", "default"), key)
+
+        before = self.versions()
+        self.other.delete()
+        self.assertEqual(get_version(LANDING_NAMESPACE), before["landing"] + 1)
+
+    def test_review_bumps_its_spot_and_rating_bumps_landing(self):
+        before, key = self.versions(), landing_cache_key("", "all", "default")
+        Review.objects.create(spot=self.spot, user=self.owner, rating=4)
+        self.assertBumped(before, "spot")
+        self.assertEqual(landing_cache_key("", "all", "default"), key)
+
+        self.spot.update_average_rating()
+        self.assertBumped(before, "landing", "spot")
+        self.assertNotEqual(landing_cache_key("", "all", "default"), key)
+
+    def test_checkin_bumps_only_its_spot(self):
+        before = self.versions()
+        checkin = CheckIn.objects.create(user=self.owner, spot=self.spot)
+        self.assertBumped(before, "spot")
+
+        before = self.versions()
+        checkin.is_active = False
+        checkin.save()
+        self.assertBumped(before, "spot")
+
+
+class FragmentCacheTests(TestCase):
+    """
+    Each cached fragment is rendered, its spot changed behind the cache's
+    back with QuerySet.update() (no signals), and rendered again: the old
+    fragment is served until a part of its key changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        self.spot = StudySpot.objects.create(owner=self.owner, name="Library", location="Cebu", description="x")
+        self.spots = StudySpot.objects.filter(pk=self.spot.pk)
+
+    def landing(self):
+        # A new page version so only the card fragments can come from the cache
+        bump_version(LANDING_NAMESPACE)
+        return self.client.get("/").content.decode()
+
+    def test_landing_card_follows_updated_at_and_favorite_count(self):
+        self.assertIn("Library", self.landing())
+        self.spots.update(name="Annex")
+        self.assertNotIn("Annex", self.landing())
+        self.spots.update(favorite_count=1)
+        self.assertIn("Annex", self.landing())
+
+        self.spots.update(name="Hall")
+        self.assertNotIn("Hall", self.landing())
+        self.spots.update(updated_at=timezone.now() + timedelta(seconds=1))
+        self.assertIn("Hall", self.landing())
+
+    def test_detail_reviews_follow_the_spot_version(self):
+        reviewer = User.objects.create_user("reviewer", "reviewer@example.com", "pw")
+        review = Review.objects.create(spot=self.spot, user=reviewer, rating=4, comment="Quiet corner")
+        self.client.force_login(self.owner)
+        url = f"/spot/{self.spot.pk}/"
+        self.assertContains(self.client.get(url), "Quiet corner")
+
+        Review.objects.filter(pk=review.pk).update(comment="Loud corner")
+        self.assertNotContains(self.client.get(url), "Loud corner")
+        review.comment = "Loud corner"
+        review.save()
+        self.assertContains(self.client.get(url), "Loud corner")
+
+    def test_map_card_follows_the_spot_version(self):
+        self.client.force_login(self.owner)
+        self.assertContains(self.client.get("/map_view/"), "Library")
+
+        self.spots.update(name="Annex")
+        self.assertNotContains(self.client.get("/map_view/"), "Annex")
+        StudySpot.objects.get(pk=self.spot.pk).save()
+        self.assertContains(self.client.get("/map_view/"), "Annex")
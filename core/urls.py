@@ -1,6 +1,8 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
+from .metrics import metrics_view
+from .ratelimit import rate_limit, post_field
 
 app_name = 'core'
 
@@ -15,11 +17,13 @@ urlpatterns = [
 
     # Password Reset URLs (note: no namespace prefix needed here)
     path('password-reset/', 
+         rate_limit("password-reset-ip", limit=5, window=3600)(
+         rate_limit("password-reset-account", limit=3, window=3600, key=post_field("email"))(
          auth_views.PasswordResetView.as_view(
              template_name='password_reset.html',
              email_template_name='password_reset_email.html',  # We'll create this
              success_url='/password-reset/done/'  # Use explicit URL
-         ), 
+         ))), 
          name='password_reset'),
     
     path('password-reset/done/', 
@@ -64,6 +68,10 @@ urlpatterns = [
 
     # API
     path('api/check-username/', views.check_username_uniqueness, name='check_username_uniqueness'),
+    path('api/route/', views.route_directions, name='route_directions'),
+    path('api/spots/status/', views.spot_status, name='spot_status'),
+    path('api/spots/<int:spot_id>/favorite/', views.favorite_spot, name='favorite_spot'),
+    path('api/spots/<int:spot_id>/similar/', views.similar_spots, name='similar_spots'),
 
     path("about/", views.about, name="about"),
 
@@ -76,5 +84,8 @@ urlpatterns = [
     path('update-preferences/', views.update_preferences, name='update_preferences'), 
     path('delete-account/', views.delete_account, name='delete_account'),
 
+    # Prometheus scrape target (no trailing slash, the path scrapers default to)
+    path('metrics', metrics_view, name='metrics'),
+
 
 ]
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+In-process index of taken usernames for the availability check.
+
+A Bloom filter over every lowercased username answers "definitely
+available" without touching the database; only names the filter reports as
+possibly taken are confirmed with one query on the LOWER(username) index.
+
+Each worker keeps its own filter, so a name saved by another worker must
+reach it before the next check or the filter would call a taken name free.
+Every User save bumps the shared "usernames" cache version and stores the
+name under that version (see core/signals.py). Before answering, a worker
+adds the names saved since its own version, or rebuilds from the table if
+any has been evicted. Writes that skip signals (bulk_create,
+QuerySet.update) are picked up every REFRESH_SECONDS (new users) and
+REBUILD_SECONDS (renames). The check is advisory: uniqueness is still
+enforced by the database when a username is saved.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models.functions import Lower
+
+from .cache import bump_version, get_version
+
+REFRESH_SECONDS = 30
+REBUILD_SECONDS = 3600
+ERROR_RATE = 0.01
+USERNAMES_NAMESPACE = "usernames"
+# More saves than this since a worker's last check: rebuild instead
+MAX_CATCH_UP = 100
+
+
+def _saved_key(version):
+    return f"username-saved:{version}"
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(1024, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class UsernameIndex:
+    def __init__(self):
+        self._filter = None
+        self._version = None
+        self._last_pk = 0
+        self._built_at = 0
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+
+    def _users(self):
+        return get_user_model().objects.annotate(username_lower=Lower("username"))
+
+    def _rebuild(self, version):
+        users = self._users()
+        # Room to grow before the false-positive rate degrades
+        bloom = BloomFilter(capacity=users.count() * 2 + 1000)
+        last_pk = 0
+        for pk, username in users.values_list("pk", "username_lower").iterator(chunk_size=5000):
+            bloom.add(username)
+            last_pk = max(last_pk, pk)
+        self._filter, self._last_pk, self._version = bloom, last_pk, version
+        self._built_at = self._refreshed_at = time.monotonic()
+
+    def _refresh(self):
+        new_users = self._users().filter(pk__gt=self._last_pk).values_list("pk", "username_lower")
+        for pk, username in new_users:
+            self._filter.add(username)
+            self._last_pk = max(self._last_pk, pk)
+        self._refreshed_at = time.monotonic()
+
+    def _catch_up(self, version):
+        """Add the names saved since this filter's version; False if some are no longer known."""
+        if version == self._version:
+            return True
+        if not 0 < version - self._version <= MAX_CATCH_UP:
+            return False
+        keys = [_saved_key(v) for v in range(self._version + 1, version + 1)]
+        saved = cache.get_many(keys)
+        if len(saved) < len(keys):
+            return False
+        for username in saved.values():
+            self._filter.add(username)
+        self._version = version
+        return True
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        # Read before a rebuild, so names saved during it are replayed after
+        version = get_version(USERNAMES_NAMESPACE)
+        if self._filter is not None and version == self._version and now - self._refreshed_at < REFRESH_SECONDS:
+            return
+        with self._lock:
+            if (
+                self._filter is None
+                or now - self._built_at >= REBUILD_SECONDS
+                or self._filter.count >= self._filter.capacity
+                or not self._catch_up(version)
+            ):
+                self._rebuild(version)
+            elif now - self._refreshed_at >= REFRESH_SECONDS:
+                self._refresh()
+
+    def add(self, username):
+        """Record a username saved in this process."""
+        if self._filter is not None:
+            self._filter.add(username.lower())
+
+    def taken(self, usernames):
+        """Return the subset of `usernames` (lowercased) that already exist."""
+        self._ensure_fresh()
+        candidates = {name.lower() for name in usernames}
+        possible = [name for name in candidates if name in self._filter]
+        if not possible:
+            return set()
+        return set(
+            self._users().filter(username_lower__in=possible)
+            .values_list("username_lower", flat=True)
+        )
+
+
+username_index = UsernameIndex()
+
+
+def record_username(username):
+    """After a User save: tell this worker's index and, through the cache, every other one."""
+    username_index.add(username)
+    version = bump_version(USERNAMES_NAMESPACE)
+    cache.set(_saved_key(version), username.lower(), timeout=REBUILD_SECONDS)
+
+
+SUGGESTION_SUFFIXES = [str(n) for n in range(1, 10)] + ["_10", "_21", "_99"]
+
+
+def _candidates(username):
+    """Alternatives to a username that registration would accept, best first."""
+    User = get_user_model()
+    max_length = User._meta.get_field(User.USERNAME_FIELD).max_length
+    base = username.strip()
+    candidates = []
+    for suffix in SUGGESTION_SUFFIXES:
+        name = f"{base[:max_length - len(suffix)]}{suffix}"
+        try:
+            User.username_validator(name)
+        except ValidationError:
+            continue
+        if name not in candidates:
+            candidates.append(name)
+    return candidates
+
+
+def suggest_alternatives(usernames, count=3):
+    """
+    {username: up to `count` free alternatives} for taken usernames, with
+    one taken() lookup for the whole batch.
+    """
+    candidates = {username: _candidates(username) for username in usernames}
+    taken = username_index.taken([name for names in candidates.values() for name in names])
+    return {
+        username: [name for name in names if name.lower() not in taken][:count]
+        for username, names in candidates.items()
+    }
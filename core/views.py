@@ -4,12 +4,14 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth import login, logout, get_user_model
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db.models import Q
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.utils import timezone
 from datetime import time
 from .models import StudySpot, Review
 from .forms import ReviewForm
@@ -26,7 +28,7 @@ from .models import StudySpot, CheckIn
 from django.db import transaction
 from .models import StudySpot, CheckIn
 
-from .models import UserProfile, StaffApplication, Review, CheckIn
+from .models import StaffApplication, Review, CheckIn
 from core.models import StudySpot
 from .forms import (
     CustomUserCreationForm,
@@ -35,6 +37,21 @@ from .forms import (
     StudySpotForm,
     ReviewForm,
 )
+from .cache import (
+    landing_cache_key,
+    get_version,
+    spot_namespace,
+    attach_cache_versions,
+)
+from . import stats
+from .ratelimit import rate_limit, post_field, user_id
+from .usernames import username_index, suggest_alternatives
+from .stats import get_site_stats
+from .instrumentation import storage_call
+from .geocoding import geocode, parse_coordinates
+from .routing import RouteNotFound, find_route
+from . import favorites, hours, similarity
+from . import metrics
 
 from django.conf import settings
 
@@ -68,8 +85,7 @@ User = get_user_model()
 def contributor_required(view_func):
     @login_required
     def wrapper(request, *args, **kwargs):
-        profile = getattr(request.user, "userprofile", None)
-        if not profile or not profile.is_contributor:
+        if not request.profile.is_contributor:
             raise PermissionDenied("You are not authorized to access this page.")
         return view_func(request, *args, **kwargs)
 
@@ -99,11 +115,12 @@ def upload_studyspot_image(image_file, spot_id):
         image_file.seek(0)
         file_content = image_file.read()
 
-        supabase.storage.from_(bucket_name).upload(
-            path=path,
-            file=file_content,
-            file_options={"content-type": image_file.content_type},
-        )
+        with storage_call("upload"):
+            supabase.storage.from_(bucket_name).upload(
+                path=path,
+                file=file_content,
+                file_options={"content-type": image_file.content_type},
+            )
 
         public_url = supabase.storage.from_(bucket_name).get_public_url(path)
         public_url = f"{public_url}?v={int(time.time())}"
@@ -126,6 +143,13 @@ def landing_view(request):
     filter_by = request.GET.get("filter", "all")
     sort_by = request.GET.get("sort", "default")
 
+    # Anonymous pages are identical for every visitor, so the rendered HTML
+    # is cached per (q, filter, sort) until a spot changes.
+    cache_key = landing_cache_key(query, filter_by, sort_by)
+    html = cache.get(cache_key)
+    if html is not None:
+        return HttpResponse(html)
+
     # Base queryset
     study_spaces = StudySpot.objects.all()
 
@@ -153,27 +177,46 @@ def landing_view(request):
     elif filter_by == "trending":
         study_spaces = study_spaces.filter(is_trending=True)
 
+    # "Open now" is decided in the database, in each spot's time zone
+    depends_on_hours = "open" in (filter_by, sort_by)
+    if depends_on_hours:
+        study_spaces = hours.annotate_open(study_spaces)
+    if filter_by == "open":
+        study_spaces = study_spaces.filter(is_open=True)
+
     # ----- OPTIONAL INITIAL SORT (for first load) -----
-    if sort_by == "rating":
+    if sort_by == "open":
+        study_spaces = study_spaces.order_by("-is_open", "-is_trending", "-average_rating", "name")
+    elif sort_by == "rating":
         study_spaces = study_spaces.order_by("-average_rating", "name")
     elif sort_by == "name":
         study_spaces = study_spaces.order_by("name")
     elif sort_by == "popular":
-        study_spaces = study_spaces.order_by("-is_trending", "-average_rating", "name")
+        study_spaces = study_spaces.order_by("-favorite_count", "-average_rating", "name")
     else:
         # Default: trending first, then rating, then name
         study_spaces = study_spaces.order_by("-is_trending", "-average_rating", "name")
 
     context = {
         "study_spaces": study_spaces,
+        "study_spot_count": get_site_stats()[stats.STUDY_SPOTS],
+        "cache_ttl": settings.CACHE_TTL,
         "query": query,
         "filter_by": filter_by,
         "sort_by": sort_by,
     }
-    return render(request, "landing.html", context)
+    html = render_to_string("landing.html", context, request=request)
+    timeout = settings.CACHE_TTL
+    if depends_on_hours:
+        # Expire exactly when the next spot opens or closes
+        timeout = min(timeout, hours.seconds_until_next_change() or timeout)
+    cache.set(cache_key, html, timeout)
+    return HttpResponse(html)
 
     
 
+@rate_limit("login-ip", limit=20, window=300)
+@rate_limit("login-account", limit=10, window=900, key=post_field("username"))
 def login_view(request):
     if request.user.is_authenticated:
         return redirect("core:home")
@@ -199,6 +242,7 @@ def logout_view(request):
     return redirect("core:landing")
 
 
+@rate_limit("register-ip", limit=5, window=3600)
 def register_view(request):
     if request.method == "POST":
         form = CustomUserCreationForm(request.POST)
@@ -231,7 +275,7 @@ def home(request):
 
 @login_required(login_url="core:login")
 def map_view(request):
-    profile = UserProfile.objects.get(user=request.user)
+    profile = request.profile
 
     query = request.GET.get("q", "")
     filter_by = request.GET.get("filter", "all")
@@ -260,12 +304,20 @@ def map_view(request):
     elif filter_by == "open24":
         study_spots = study_spots.filter(open_24_7=True)
 
+    study_spots = hours.annotate_open(study_spots)
+    if filter_by == "open":
+        study_spots = study_spots.filter(is_open=True)
+
+    study_spots = attach_cache_versions(study_spots)
+
     return render(
         request,
         "map_view.html",
         {
             "study_spots": study_spots,
-            "profile": profile
+            "favorite_ids": sorted(favorites.favorite_ids(request.user)),
+            "profile": profile,
+            "cache_ttl": settings.CACHE_TTL,
         }
     )
 
@@ -274,7 +326,7 @@ def map_view(request):
 
 @login_required(login_url="core:login")
 def profile_view(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     return render(
         request,
         "profile.html",
@@ -287,7 +339,7 @@ def profile_view(request):
 
 @login_required(login_url="core:login")
 def manage_profile(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
 
     if request.method == "POST":
         first_name = request.POST.get("first_name", "").strip()
@@ -315,26 +367,36 @@ def manage_profile(request):
             )
             return redirect("core:manage_profile")
 
+        # Only what the form actually changed is written
         user = request.user
-        user.first_name = first_name
-        user.last_name = last_name
-        user.username = username
-        user.email = email
+        user_fields = {"first_name": first_name, "last_name": last_name, "username": username, "email": email}
+        changed_user_fields = [field for field, value in user_fields.items() if getattr(user, field) != value]
+        for field in changed_user_fields:
+            setattr(user, field, user_fields[field])
 
-        try:
-            user.save()
-        except Exception as e:
-            messages.error(request, f"Update failed: {e}")
-            return redirect("core:manage_profile")
+        if changed_user_fields:
+            try:
+                user.save(update_fields=changed_user_fields)
+            except Exception as e:
+                messages.error(request, f"Update failed: {e}")
+                return redirect("core:manage_profile")
 
-        profile.middle_initial = middle_initial
-        profile.phone_number = phone_number
-        profile.bio = bio
+        profile_fields = {
+            "middle_initial": middle_initial,
+            "phone_number": phone_number,
+            "bio": bio,
+            "full_name": f"{first_name} {middle_initial} {last_name}".strip(),
+        }
+        # The columns are nullable; an empty input leaves a NULL alone
+        changed_fields = [field for field, value in profile_fields.items() if (getattr(profile, field) or "") != value]
+        for field in changed_fields:
+            setattr(profile, field, profile_fields[field])
 
         # Avatar handling
         if avatar_removed == "true":
             placeholder_path = settings.STATIC_URL + "imgs/avatar_placeholder.jpg"
             profile.avatar_url = placeholder_path
+            changed_fields.append("avatar_url")
 
         elif avatar:
             if not supabase:
@@ -345,21 +407,23 @@ def manage_profile(request):
             file_content = avatar.file.read()
 
             try:
-                supabase.storage.from_(bucket_name).update(
-                    file=file_content,
-                    path=full_file_path,
-                    file_options={"content-type": avatar.content_type},
-                )
+                with storage_call("update"):
+                    supabase.storage.from_(bucket_name).update(
+                        file=file_content,
+                        path=full_file_path,
+                        file_options={"content-type": avatar.content_type},
+                    )
             except Exception as e:
                 # Fallback: upload if file doesn't exist yet
                 try:
                     avatar.file.seek(0)
                     file_content = avatar.file.read()
-                    supabase.storage.from_(bucket_name).upload(
-                        file=file_content,
-                        path=full_file_path,
-                        file_options={"content-type": avatar.content_type},
-                    )
+                    with storage_call("upload"):
+                        supabase.storage.from_(bucket_name).upload(
+                            file=file_content,
+                            path=full_file_path,
+                            file_options={"content-type": avatar.content_type},
+                        )
                 except Exception as upload_e:
                     print(f"Avatar upload error: {upload_e}")
                     messages.error(request, "Failed to upload profile picture.")
@@ -372,9 +436,10 @@ def manage_profile(request):
                 base_url = base_url[:-1]
             public_url = f"{base_url}?cachebuster={int(time.time())}"
             profile.avatar_url = public_url
+            changed_fields.append("avatar_url")
 
-        profile.full_name = f"{first_name} {middle_initial} {last_name}".strip()
-        profile.save()
+        if changed_fields:
+            profile.save(update_fields=changed_fields)
 
         messages.success(request, "Profile updated successfully.")
         return redirect("core:profile")
@@ -390,7 +455,7 @@ def manage_profile(request):
 
 @contributor_required
 def create_listing(request):
-    profile = UserProfile.objects.get(user=request.user)
+    profile = request.profile
 
     if request.method == "POST":
         name = request.POST.get("name")
@@ -411,8 +476,14 @@ def create_listing(request):
         closing_time = request.POST.get("closing_time")
 
         
-        lat = request.POST.get("lat")
-        lng = request.POST.get("lng")
+        # Trust the map picker only if it sent real coordinates; otherwise
+        # use the address if it was geocoded before. New addresses are left
+        # to backfill_coordinates rather than holding up the request.
+        coordinates = parse_coordinates(request.POST.get("lat"), request.POST.get("lng"))
+        if coordinates is None and location:
+            found = geocode(location, cached_only=True)
+            coordinates = (found.lat, found.lng) if found else None
+        lat, lng = coordinates or (None, None)
 
         
         images_uploaded = request.FILES.getlist("images")
@@ -450,6 +521,12 @@ def create_listing(request):
         spot.images = uploaded_urls
         spot.save()
 
+        if coordinates is None:
+            messages.warning(
+                request,
+                "This listing will appear on the map once its address has been located. "
+                "Edit the listing to pin its location now.",
+            )
         messages.success(request, "Listing successfully created!")
         return redirect("core:home")
 
@@ -465,7 +542,7 @@ def my_listings(request):
 
 @contributor_required
 def edit_listing(request, spot_id):
-    profile = UserProfile.objects.get(user=request.user)
+    profile = request.profile
     spot = get_object_or_404(StudySpot, id=spot_id)
 
     # safety: only owner can edit
@@ -498,20 +575,19 @@ def edit_listing(request, spot_id):
             spot.closing_time = closing_time
 
         # ---------- LOCATION (LAT / LNG) ----------
-        lat = request.POST.get("lat")
-        lng = request.POST.get("lng")
-
-        if lat and lat not in ["None", "null", "undefined", ""]:
-            try:
-                spot.lat = float(lat)
-            except (ValueError, TypeError):
-                pass
+        raw_lat = request.POST.get("lat", "")
+        raw_lng = request.POST.get("lng", "")
+        coordinates = parse_coordinates(raw_lat, raw_lng)
 
-        if lng and lng not in ["None", "null", "undefined", ""]:
-            try:
-                spot.lng = float(lng)
-            except (ValueError, TypeError):
-                pass
+        if coordinates:
+            spot.lat, spot.lng = coordinates
+        else:
+            if {raw_lat, raw_lng} - {"", "None", "null", "undefined"}:
+                messages.warning(request, "The map location was invalid and has not been changed.")
+            if spot.lat is None or spot.lng is None:
+                found = geocode(spot.location, cached_only=True)
+                if found:
+                    spot.lat, spot.lng = found.lat, found.lng
 
         # ---------- IMAGES (MERGE CURRENT + NEW VIA images_json) ----------
         raw_images = request.POST.get("images_json", "").strip()
@@ -590,7 +666,7 @@ def delete_listing(request, id):
 
 @login_required
 def apply_staff(request):
-    profile = UserProfile.objects.get(user=request.user)
+    profile = request.profile
     application = StaffApplication.objects.filter(user=request.user).first()
 
     if request.method == "POST":
@@ -623,11 +699,12 @@ def apply_staff(request):
                 # IMPORTANT: path is INSIDE the bucket (do NOT prefix with "staff_docs/")
                 path = f"{field_name}/{request.user.id}/{filename}"
 
-                supabase.storage.from_("staff_docs").upload(
-                    path,
-                    uploaded_file.read(),
-                    {"content-type": uploaded_file.content_type},
-                )
+                with storage_call("upload"):
+                    supabase.storage.from_("staff_docs").upload(
+                        path,
+                        uploaded_file.read(),
+                        {"content-type": uploaded_file.content_type},
+                    )
 
                 # NOTE: this returns a public URL only if the bucket is public
                 public_url = supabase.storage.from_("staff_docs").get_public_url(path)
@@ -651,37 +728,18 @@ def apply_staff(request):
 
 # ---------- STUDYSPOT DETAIL / REVIEWS ----------
 
+SIMILAR_ON_DETAIL = 4
+SIMILAR_ON_PREVIEW = 3
+
+
 def studyspot_detail(request, spot_id):
-    spot = get_object_or_404(StudySpot, id=spot_id)
-    
-    # ===============================
-    # Auto check-out logic
-    # ===============================
-    now = timezone.localtime().time()  # current local time
-
-    if not spot.open_24_7 and spot.closing_time:
-        # Handle overnight closing (closing_time < opening_time)
-        if spot.closing_time < spot.opening_time:
-            # Spot closes after midnight
-            if now >= spot.closing_time and now < spot.opening_time:
-                active_checkins = spot.active_users.filter(is_active=True)
-                for checkin in active_checkins:
-                    checkin.is_active = False
-                    checkin.check_out_time = timezone.now()
-                    checkin.save()
-        else:
-            # Normal closing
-            if now >= spot.closing_time:
-                active_checkins = spot.active_users.filter(is_active=True)
-                for checkin in active_checkins:
-                    checkin.is_active = False
-                    checkin.check_out_time = timezone.now()
-                    checkin.save()
+    spot = get_object_or_404(hours.annotate_open(StudySpot.objects.all()), id=spot_id)
 
     # ===============================
     # Handle POST review submission
     # ===============================
-    reviews = spot.reviews.all().order_by("-created_at")
+    # Lazy: only evaluated when the cached review fragment has expired
+    reviews = spot.reviews.select_related("user").order_by("-created_at")
 
     if request.method == "POST":
         if not request.user.is_authenticated:
@@ -711,7 +769,14 @@ def studyspot_detail(request, spot_id):
     return render(
         request,
         "studyspot_detail.html",
-        {"spot": spot, "reviews": reviews, "form": form},
+        {
+            "spot": spot,
+            "reviews": reviews,
+            "form": form,
+            "cache_ttl": settings.CACHE_TTL,
+            "spot_cache_version": get_version(spot_namespace(spot.id)),
+            "similar_spots": similarity.similar_to(spot.id, limit=SIMILAR_ON_DETAIL),
+        },
     )
 
 
@@ -726,54 +791,74 @@ def trending_studyspots(request):
 
 # ---------- AJAX USERNAME UNIQUENESS ----------
 
+MAX_USERNAME_BATCH = 20
+
 
 
 
 @csrf_exempt
 @login_required
 @require_http_methods(["POST"])
+@rate_limit("check-username", limit=60, window=60, key=user_id, json=True)
 def check_username_uniqueness(request):
+    """
+    Check one username ({"username": ...}) or a batch ({"usernames": [...]}).
+    Taken names come back with a few free alternatives.
+    """
     try:
         data = json.loads(request.body)
-        username_to_check = data.get("username", "").strip()
-    except json.JSONDecodeError:
+        if "usernames" in data:
+            if not isinstance(data["usernames"], list):
+                return JsonResponse({"error": "usernames must be a list."}, status=400)
+            candidates = [str(name).strip() for name in data["usernames"]][:MAX_USERNAME_BATCH]
+        else:
+            candidates = [data.get("username", "").strip()]
+    except (json.JSONDecodeError, AttributeError, TypeError):
         return JsonResponse({"error": "Invalid JSON payload."}, status=400)
 
     current_username = request.user.username
-
-    if not username_to_check:
-        return JsonResponse({"is_available": True}, status=200)
-
-    if username_to_check == current_username:
-        return JsonResponse(
-            {"is_available": True, "message": "Username is the same."},
-            status=200,
-        )
+    to_check = [name for name in candidates if name and name != current_username]
 
     try:
-        if User.objects.filter(username__iexact=username_to_check).exists():
-            is_available = False
-            message = "Username already taken."
-        else:
-            is_available = True
-            message = "Username is available."
-
-        return JsonResponse(
-            {"is_available": is_available, "message": message}, status=200
-        )
+        taken = username_index.taken(to_check)
+        suggestions = suggest_alternatives([name for name in to_check if name.lower() in taken])
     except Exception as e:
         print(f"Database Query Error: {e}")
         return JsonResponse(
             {"error": "Database error during availability check."}, status=500
         )
 
+    results = []
+    for name in candidates:
+        if not name:
+            results.append({"username": name, "is_available": True})
+        elif name == current_username:
+            results.append(
+                {"username": name, "is_available": True, "message": "Username is the same."}
+            )
+        elif name.lower() in taken:
+            results.append({
+                "username": name,
+                "is_available": False,
+                "message": "Username already taken.",
+                "suggestions": suggestions[name],
+            })
+        else:
+            results.append(
+                {"username": name, "is_available": True, "message": "Username is available."}
+            )
+
+    if "usernames" in data:
+        return JsonResponse({"results": results}, status=200)
+    return JsonResponse(results[0], status=200)
+
 
 @login_required(login_url="core:login")
 def my_reviews(request):
     """
     Display all reviews made by the current user.
     """
-    profile = UserProfile.objects.get(user=request.user)
+    profile = request.profile
     
     # Get all reviews by the current user, ordered by most recent first
     user_reviews = Review.objects.filter(user=request.user).select_related('spot').order_by('-created_at')
@@ -799,23 +884,11 @@ def check_in_out_toggle(request, spot_id):
     Prevents check-ins if the spot is closed.
     """
     if request.method == 'POST':
-        spot = get_object_or_404(StudySpot, id=spot_id)
+        spot = get_object_or_404(hours.annotate_open(StudySpot.objects.all()), id=spot_id)
         user = request.user
-        
-        # Check if spot is closed (not 24/7)
-        now = timezone.localtime().time()
-        spot_closed = False
-
-        if not spot.open_24_7 and spot.closing_time:
-            # Overnight handling
-            if spot.closing_time < spot.opening_time:
-                if now >= spot.closing_time and now < spot.opening_time:
-                    spot_closed = True
-            else:
-                if now >= spot.closing_time:
-                    spot_closed = True
-        
-        if spot_closed:
+
+        if not spot.is_open:
+            metrics.CHECKIN_TOGGLES.labels("closed").inc()
             messages.error(request, f"{spot.name} is currently closed. You cannot check in now.")
             return redirect('core:studyspot_detail', spot_id=spot.id)
         
@@ -824,26 +897,25 @@ def check_in_out_toggle(request, spot_id):
         
         # Scenario A: User is already checked into THIS spot (Action: CHECK OUT)
         if active_checkin and active_checkin.spot == spot:
-            active_checkin.is_active = False
-            active_checkin.check_out_time = timezone.now()
-            active_checkin.save()
+            active_checkin.check_out()
+            metrics.CHECKIN_TOGGLES.labels("out").inc()
             messages.info(request, f"You have successfully checked out of {spot.name}.")
         
         # Scenario B: User is checked into a DIFFERENT spot (Action: SWITCH)
         elif active_checkin and active_checkin.spot != spot:
             # Check out of old spot
-            active_checkin.is_active = False
-            active_checkin.check_out_time = timezone.now()
-            active_checkin.save()
+            active_checkin.check_out()
             messages.warning(request, f"You checked out of {active_checkin.spot.name}.")
             
             # Check into new spot (create NEW record)
             CheckIn.objects.create(user=user, spot=spot, is_active=True)
+            metrics.CHECKIN_TOGGLES.labels("switch").inc()
             messages.success(request, f"You are now checked in at {spot.name}! Good luck studying.")
 
         # Scenario C: User is NOT checked in anywhere (Action: CHECK IN)
         else:
             CheckIn.objects.create(user=user, spot=spot, is_active=True)
+            metrics.CHECKIN_TOGGLES.labels("in").inc()
             messages.success(request, f"You are now checked in at {spot.name}! Good luck studying.")
 
     return redirect('core:studyspot_detail', spot_id=spot_id)
@@ -857,12 +929,11 @@ def settings_view(request):
     """
     user = request.user
     
-    # Get or create user profile
-    profile, created = UserProfile.objects.get_or_create(user=user)
+    profile = request.profile
     
     # Get user statistics
-    user_reviews = user.review_set.all().count() if hasattr(user, 'review_set') else 0
-    favorite_spaces = user.favorite_spaces.all().count() if hasattr(user, 'favorite_spaces') else 0
+    user_reviews = user.reviews.count()
+    favorite_spaces = len(favorites.favorite_ids(user))
     
     context = {
         'user': user,
@@ -901,20 +972,9 @@ def update_preferences(request):
     Handle user preferences and notification settings
     """
     if request.method == 'POST':
-        profile, created = UserProfile.objects.get_or_create(user=request.user)
-        
-        # Update notification preferences
-        profile.email_notifications = request.POST.get('email_notifications') == 'on'
-        profile.review_notifications = request.POST.get('review_notifications') == 'on'
-        profile.marketing_emails = request.POST.get('marketing_emails') == 'on'
-        
-        # Update privacy settings
-        profile.profile_visibility = request.POST.get('profile_visibility', 'public')
-        profile.show_activity = request.POST.get('show_activity') == 'on'
-        
-        profile.save()
-        
-        messages.success(request, 'Preferences updated successfully!')
+        # UserProfile has no notification or privacy columns yet, so there
+        # is nothing to store; don't rewrite the profile row for nothing.
+        messages.info(request, 'Notification and privacy preferences cannot be saved yet.')
         return redirect('settings.html')
     
     return redirect('settings.html')
@@ -931,7 +991,7 @@ def delete_account(request):
         if confirmation.lower() == 'delete my account':
             user = request.user
             user.is_active = False
-            user.save()
+            user.save(update_fields=["is_active"])
             
             messages.success(request, 'Your account has been deactivated. We\'re sorry to see you go!')
             return redirect('core:landing')
@@ -944,16 +1004,14 @@ def delete_account(request):
 
 @login_required(login_url="core:login")
 def about(request):
-    profile = UserProfile.objects.get(user=request.user)
-    study_spot_count = StudySpot.objects.count
-    active_user_count = User.objects.filter(is_active=True).count()
-    city_count = StudySpot.objects.values('location').distinct().count() or 1
+    profile = request.profile
+    site_stats = get_site_stats()
 
     context = {
         "profile": profile,
-        "study_spot_count": study_spot_count,
-        "active_user_count": active_user_count,
-        "city_count": city_count,
+        "study_spot_count": site_stats[stats.STUDY_SPOTS],
+        "active_user_count": site_stats[stats.ACTIVE_USERS],
+        "city_count": site_stats[stats.CITIES] or 1,
     }
     return render(request, "about.html", context)
 
@@ -980,3 +1038,105 @@ def delete_review(request, review_id):
         return redirect("core:my_reviews")
     
     return redirect("core:my_reviews")
+
+
+def _point(value):
+    lat, _, lng = value.partition(",")
+    return parse_coordinates(lat, lng)
+
+
+@login_required
+@require_http_methods(["GET"])
+@rate_limit("route", limit=30, window=60, key=user_id, methods=("GET",), json=True)
+def route_directions(request):
+    """
+    Road route for "Get Directions": GET ?from=lat,lng&to=lat,lng returns
+    distance (m), duration (s) and a simplified [[lat, lng], ...] polyline.
+    """
+    origin = _point(request.GET.get("from", ""))
+    destination = _point(request.GET.get("to", ""))
+    if origin is None or destination is None:
+        return JsonResponse({"error": "from and to must be lat,lng pairs."}, status=400)
+
+    try:
+        route, cached, approximate = find_route(origin, destination)
+    except RouteNotFound:
+        return JsonResponse({"error": "No route found for this destination."}, status=404)
+
+    response = JsonResponse({
+        "distance": route.distance,
+        "duration": route.duration,
+        "coordinates": route.coordinates,
+        "cached": cached,
+        "approximate": approximate,
+    })
+    if not approximate:
+        response["Cache-Control"] = "private, max-age=300"
+    return response
+
+
+MAX_STATUS_SPOTS = 500
+
+
+@login_required
+@require_http_methods(["GET"])
+def spot_status(request):
+    """
+    Open/closed status for the map: GET ?ids=1,2,3 returns
+    {"spots": {id: {"open": bool, "next_change": ISO datetime}}}.
+    The map asks again once a spot's next_change has passed.
+    """
+    try:
+        ids = [int(pk) for pk in request.GET.get("ids", "").split(",") if pk][:MAX_STATUS_SPOTS]
+    except ValueError:
+        return JsonResponse({"error": "ids must be a comma-separated list of spot ids."}, status=400)
+
+    spots = list(hours.annotate_open(StudySpot.objects.filter(pk__in=ids).only(*hours.HOURS_FIELDS)))
+    return JsonResponse({
+        "spots": {
+            spot.pk: {
+                "open": spot.is_open,
+                "next_change": spot.next_status_change_at,
+            }
+            for spot in spots
+        },
+    })
+
+
+@login_required
+@require_http_methods(["POST", "DELETE"])
+@rate_limit("favorite", limit=60, window=60, key=user_id, methods=("POST", "DELETE"), json=True)
+def favorite_spot(request, spot_id):
+    """
+    POST favorites the spot, DELETE unfavorites it; both are idempotent.
+    Returns {"favorited": bool, "favorite_count": int}.
+    """
+    spot = get_object_or_404(StudySpot.objects.only("pk"), id=spot_id)
+    if request.method == "POST":
+        favorites.add_favorite(request.user, spot)
+    else:
+        favorites.remove_favorite(request.user, spot)
+    count = StudySpot.objects.filter(pk=spot.pk).values_list("favorite_count", flat=True).get()
+    return JsonResponse({"favorited": request.method == "POST", "favorite_count": count})
+
+
+@login_required
+@require_http_methods(["GET"])
+def similar_spots(request, spot_id):
+    """Precomputed "similar spots" for the map preview; never computed here."""
+    similar = similarity.similar_to(spot_id, limit=SIMILAR_ON_PREVIEW)
+    response = JsonResponse({
+        "spots": [
+            {
+                "id": spot.pk,
+                "name": spot.name,
+                "location": spot.location,
+                "rating": float(spot.average_rating),
+                "url": reverse("core:studyspot_detail", args=[spot.pk]),
+            }
+            for spot in similar
+        ],
+    })
+    # Lists only change when the nightly job runs
+    response["Cache-Control"] = "private, max-age=3600"
+    return response
@@ -0,0 +1,10 @@
+# Loaded automatically by gunicorn from the working directory.
+import os
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's files from the shared metrics directory
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
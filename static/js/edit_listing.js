@@ -540,16 +540,13 @@ document.addEventListener("DOMContentLoaded", () => {
         return;
       }
 
-      if (!window.supabase || !SUPABASE_URL || !SUPABASE_KEY) {
+      if (!SUPABASE_URL || !SUPABASE_KEY) {
         console.warn("Supabase not configured, submitting without image upload.");
         return;
       }
 
       e.preventDefault();
 
-      const { createClient } = supabase;
-      const supabaseClient = createClient(SUPABASE_URL, SUPABASE_KEY);
-
       submitBtn.disabled = true;
 
       const files = Array.from(imageUpload.files);
@@ -565,22 +562,27 @@ document.addEventListener("DOMContentLoaded", () => {
             .slice(2)}.${ext}`;
           const filePath = `spots/${listingId}/${fileName}`;
 
-          const { error: uploadError } = await supabaseClient.storage
-            .from(bucketName)
-            .upload(filePath, file, { upsert: true });
+          // Supabase Storage REST API; the same requests supabase-js sends
+          const response = await fetch(
+            `${SUPABASE_URL}/storage/v1/object/${bucketName}/${filePath}`,
+            {
+              method: "POST",
+              headers: {
+                Authorization: `Bearer ${SUPABASE_KEY}`,
+                apikey: SUPABASE_KEY,
+                "Content-Type": file.type || "application/octet-stream",
+                "x-upsert": "true",
+              },
+              body: file,
+            }
+          );
 
-          if (uploadError) {
-            console.error("Supabase upload error:", uploadError);
+          if (!response.ok) {
+            console.error("Supabase upload error:", response.status, await response.text());
             continue;
           }
 
-          const { data: publicData } = supabaseClient.storage
-            .from(bucketName)
-            .getPublicUrl(filePath);
-
-          if (publicData && publicData.publicUrl) {
-            uploadedUrls.push(publicData.publicUrl);
-          }
+          uploadedUrls.push(`${SUPABASE_URL}/storage/v1/object/public/${bucketName}/${filePath}`);
         }
 
         // MERGE existing + new images (dedup)
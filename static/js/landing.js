@@ -212,9 +212,9 @@ document.addEventListener('DOMContentLoaded', () => {
             return ratingB - ratingA;
           }
           case 'popular': {
-            const trendingA = a.getAttribute('data-trending') === 'true' ? 1 : 0;
-            const trendingB = b.getAttribute('data-trending') === 'true' ? 1 : 0;
-            return trendingB - trendingA;
+            const favoritesA = Number(a.getAttribute('data-favorites')) || 0;
+            const favoritesB = Number(b.getAttribute('data-favorites')) || 0;
+            return favoritesB - favoritesA;
           }
           case 'nearest':{
             return 0;
@@ -46,6 +46,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const previewStatusBadge = document.querySelector(".preview-status-badge");
   const previewTagsContainer = document.querySelector(".preview-spot-tags");
   const viewDetailsBtn = document.querySelector(".preview-view-btn");
+  const previewSimilar = document.querySelector(".preview-similar");
 
   const locationBtn = document.getElementById("locationBtn");
 
@@ -56,7 +57,10 @@ document.addEventListener("DOMContentLoaded", () => {
   // =========================
   const spotDataMap = new Map();
   const leafletMarkers = [];
-  const favorites = new Set();
+  const favoriteIdsElement = document.getElementById("favorite-spot-ids");
+  const favorites = new Set(
+    (favoriteIdsElement ? JSON.parse(favoriteIdsElement.textContent) : []).map(String)
+  );
 
   let studyMap = null;
   let locationMarker = null;
@@ -176,34 +180,14 @@ document.addEventListener("DOMContentLoaded", () => {
   // =========================
   // 4. OPEN/CLOSE STATUS LOGIC
   // =========================
-  function computeOpenStatus(opening, closing, open24) {
-    if (open24 === true || open24 === "true" || open24 === "True") {
-      return "open";
-    }
-
-    if (!opening || !closing) {
-      return "closed";
-    }
-
-    const now = new Date();
-    const nowMinutes = now.getHours() * 60 + now.getMinutes();
-
-    const [oh, om] = opening.split(":").map(Number);
-    const [ch, cm] = closing.split(":").map(Number);
-
-    const openMinutes = oh * 60 + om;
-    const closeMinutes = ch * 60 + cm;
-
-    // Overnight (e.g. 18:00 - 02:00)
-    if (closeMinutes < openMinutes) {
-      if (nowMinutes >= 0 && nowMinutes < closeMinutes) return "open";
-      if (nowMinutes >= openMinutes && nowMinutes <= 1439) return "open";
-      return "closed";
-    }
-
-    return nowMinutes >= openMinutes && nowMinutes <= closeMinutes
-      ? "open"
-      : "closed";
+  // Open/closed is decided on the server (core/hours.py), in each spot's
+  // own time zone. Cards carry the status and when it next changes; once
+  // that moment has passed the map asks /api/spots/status/ again.
+  const STATUS_BATCH_SIZE = 200;
+
+  function parseNextChange(value) {
+    const time = value ? Date.parse(value) : NaN;
+    return Number.isFinite(time) ? time : null;
   }
 
   function formatTime24To12(timeStr) {
@@ -234,11 +218,7 @@ document.addEventListener("DOMContentLoaded", () => {
       card.querySelector(".spot-location span")?.textContent?.trim() ||
       "";
 
-    const dynamicStatus = computeOpenStatus(
-      data.opening,
-      data.closing,
-      datasetToBool(data.open24)
-    );
+    const dynamicStatus = data.status === "open" ? "open" : "closed";
 
     const badge = card.querySelector(".map-status-badge");
     if (badge) {
@@ -280,6 +260,7 @@ document.addEventListener("DOMContentLoaded", () => {
       location: spotLocation,
       rating: Number.isFinite(ratingValue) ? ratingValue : 0,
       status: dynamicStatus,
+      nextChange: parseNextChange(data.nextChange),
       opening: data.opening,
       closing: data.closing,
       image,
@@ -561,9 +542,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const marker = spot.marker;
 
-    const isOpen =
-      computeOpenStatus(spot.opening, spot.closing, spot.amenities.open24) ===
-      "open";
+    const isOpen = spot.status === "open";
 
     marker.setIcon(getCustomIcon(isOpen, true));
     highlightedMarker = marker;
@@ -584,12 +563,7 @@ document.addEventListener("DOMContentLoaded", () => {
       const spot = spotDataMap.get(highlightedMarker.spotId);
       let isOpen = false;
       if (spot) {
-        isOpen =
-          computeOpenStatus(
-            spot.opening,
-            spot.closing,
-            spot.amenities.open24
-          ) === "open";
+        isOpen = spot.status === "open";
       }
       highlightedMarker.setIcon(getCustomIcon(isOpen, false));
 
@@ -790,9 +764,54 @@ document.addEventListener("DOMContentLoaded", () => {
       previewTagsContainer.innerHTML = tagsHtml;
     }
 
+    loadSimilarSpots(spotId);
+
     mapPreviewCard.classList.add("active");
   }
 
+  // Precomputed nightly on the server; one small request per spot
+  const similarSpotsCache = new Map();
+
+  async function loadSimilarSpots(spotId) {
+    if (!previewSimilar) return;
+    previewSimilar.hidden = true;
+    previewSimilar.innerHTML = "";
+
+    let similar = similarSpotsCache.get(spotId);
+    if (!similar) {
+      try {
+        const res = await fetch(`/api/spots/${spotId}/similar/`);
+        if (!res.ok) return;
+        similar = (await res.json()).spots || [];
+        similarSpotsCache.set(spotId, similar);
+      } catch (err) {
+        console.error("Failed to load similar spots:", err);
+        return;
+      }
+    }
+    // The user may have moved on to another spot meanwhile
+    if (spotId !== currentPreviewSpotId || similar.length === 0) return;
+
+    const heading = document.createElement("span");
+    heading.className = "preview-similar-heading";
+    heading.textContent = "Similar spots";
+    previewSimilar.appendChild(heading);
+
+    similar.forEach((item) => {
+      const link = document.createElement("a");
+      link.href = item.url;
+      link.textContent = item.name;
+      link.addEventListener("click", (e) => {
+        if (spotDataMap.has(String(item.id))) {
+          e.preventDefault();
+          showPreviewCard(String(item.id));
+        }
+      });
+      previewSimilar.appendChild(link);
+    });
+    previewSimilar.hidden = false;
+  }
+
   if (previewCloseBtn) {
     previewCloseBtn.addEventListener("click", () => {
       mapPreviewCard.classList.remove("active");
@@ -857,6 +876,8 @@ document.addEventListener("DOMContentLoaded", () => {
 
   const filterToDatasetMap = {
     wifi: "wifi",
+    open: "open",
+    favorite: "favorite",
     open24: "open24",
     outlets: "outlets",
     coffee: "coffee",
@@ -1206,30 +1227,54 @@ document.addEventListener("DOMContentLoaded", () => {
   // =========================
   // 14. FAVORITES
   // =========================
+  const csrfInput = document.querySelector("[name=csrfmiddlewaretoken]");
+
+  function renderFavorite(card, favoriteBtn, isFavorite) {
+    card.dataset.favorite = isFavorite ? "true" : "false";
+    favoriteBtn.classList.toggle("active", isFavorite);
+    const heartIcon = favoriteBtn.querySelector("i");
+    if (heartIcon) {
+      heartIcon.classList.toggle("fas", isFavorite);
+      heartIcon.classList.toggle("far", !isFavorite);
+    }
+  }
+
   spotCards.forEach((card) => {
     const favoriteBtn = card.querySelector(".favorite-btn");
     const spotId = card.dataset.spotId;
 
     if (!favoriteBtn || !spotId) return;
 
-    favoriteBtn.addEventListener("click", (e) => {
-      e.stopPropagation();
+    renderFavorite(card, favoriteBtn, favorites.has(spotId));
 
-      favoriteBtn.classList.toggle("active");
-      const heartIcon = favoriteBtn.querySelector("i");
+    favoriteBtn.addEventListener("click", async (e) => {
+      // The button sits inside the card link
+      e.preventDefault();
+      e.stopPropagation();
 
-      if (favoriteBtn.classList.contains("active")) {
+      const wasFavorite = favorites.has(spotId);
+      const isFavorite = !wasFavorite;
+      if (isFavorite) {
         favorites.add(spotId);
-        if (heartIcon) {
-          heartIcon.classList.remove("far");
-          heartIcon.classList.add("fas");
-        }
       } else {
         favorites.delete(spotId);
-        if (heartIcon) {
-          heartIcon.classList.remove("fas");
-          heartIcon.classList.add("far");
+      }
+      renderFavorite(card, favoriteBtn, isFavorite);
+
+      try {
+        const res = await fetch(`/api/spots/${spotId}/favorite/`, {
+          method: isFavorite ? "POST" : "DELETE",
+          headers: { "X-CSRFToken": csrfInput ? csrfInput.value : "" },
+        });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      } catch (err) {
+        console.error("Failed to update favorite:", err);
+        if (wasFavorite) {
+          favorites.add(spotId);
+        } else {
+          favorites.delete(spotId);
         }
+        renderFavorite(card, favoriteBtn, wasFavorite);
       }
     });
   });
@@ -1290,34 +1335,56 @@ document.addEventListener("DOMContentLoaded", () => {
   // =========================
   // 17. STATUS REFRESH
   // =========================
-  function refreshSpotStatuses() {
-    spotDataMap.forEach((spot) => {
-      const newStatus = computeOpenStatus(
-        spot.opening,
-        spot.closing,
-        spot.amenities.open24
-      );
-
-      spot.status = newStatus;
-
-      if (spot.card) {
-        const badge = spot.card.querySelector(".map-status-badge");
-        if (badge) {
-          const label = newStatus === "open" ? "Open" : "Closed";
-          badge.setAttribute("data-label", label);
-          badge.classList.remove("status-init", "open", "closed");
-          badge.classList.add(newStatus);
-        }
+  function applySpotStatus(spot, newStatus) {
+    spot.status = newStatus;
+
+    if (spot.card) {
+      spot.card.dataset.status = newStatus;
+      spot.card.dataset.open = newStatus === "open" ? "true" : "false";
+      const badge = spot.card.querySelector(".map-status-badge");
+      if (badge) {
+        const label = newStatus === "open" ? "Open" : "Closed";
+        badge.setAttribute("data-label", label);
+        badge.classList.remove("status-init", "open", "closed");
+        badge.classList.add(newStatus);
       }
+    }
 
-      const marker = spot.marker;
-      if (marker) {
-        const isHighlighted = marker === highlightedMarker;
-        marker.setIcon(
-          getCustomIcon(newStatus === "open", isHighlighted)
-        );
+    const marker = spot.marker;
+    if (marker) {
+      const isHighlighted = marker === highlightedMarker;
+      marker.setIcon(
+        getCustomIcon(newStatus === "open", isHighlighted)
+      );
+    }
+  }
+
+  async function refreshSpotStatuses() {
+    const now = Date.now();
+    const dueIds = [];
+    spotDataMap.forEach((spot) => {
+      if (spot.nextChange !== null && spot.nextChange <= now) {
+        dueIds.push(spot.id);
       }
     });
+    if (dueIds.length === 0) return;
+
+    for (let i = 0; i < dueIds.length; i += STATUS_BATCH_SIZE) {
+      const ids = dueIds.slice(i, i + STATUS_BATCH_SIZE).join(",");
+      try {
+        const res = await fetch(`/api/spots/status/?ids=${ids}`);
+        if (!res.ok) continue;
+        const data = await res.json();
+        Object.entries(data.spots || {}).forEach(([spotId, status]) => {
+          const spot = spotDataMap.get(spotId);
+          if (!spot) return;
+          spot.nextChange = parseNextChange(status.next_change);
+          applySpotStatus(spot, status.open ? "open" : "closed");
+        });
+      } catch (err) {
+        console.error("Failed to refresh spot statuses:", err);
+      }
+    }
 
     if (currentPreviewSpotId && previewStatusBadge) {
       const s = spotDataMap.get(currentPreviewSpotId);
@@ -1483,24 +1550,18 @@ document.addEventListener("DOMContentLoaded", () => {
     const user = { lat: userLatLng.lat, lng: userLatLng.lng };
     const dest = { lat: spotLatLng.lat, lng: spotLatLng.lng };
 
-    // OSRM public demo server (road-network routing)
-    const url = `https://router.project-osrm.org/route/v1/driving/${user.lng},${user.lat};${dest.lng},${dest.lat}?overview=full&geometries=geojson`;
+    // Routed (and cached) by the server; coordinates come back as [lat, lng]
+    const url = `/api/route/?from=${user.lat},${user.lng}&to=${dest.lat},${dest.lng}`;
 
     fetch(url)
       .then((res) => res.json())
-      .then((data) => {
-        if (!data.routes || !data.routes.length) {
-          alert("No route found for this destination.");
+      .then((route) => {
+        if (route.error) {
+          alert(route.error);
           return;
         }
 
-        const route = data.routes[0];
-
-        // Convert [lng, lat] → [lat, lng] for Leaflet
-        const coords = route.geometry.coordinates.map(([lng, lat]) => [
-          lat,
-          lng,
-        ]);
+        const coords = route.coordinates;
 
         // Distance (m → km) and duration (s → minutes)
         const distanceKm = route.distance / 1000;
@@ -1555,7 +1616,11 @@ document.addEventListener("DOMContentLoaded", () => {
                   ${rows}
                 </tbody>
               </table>
-              <small style="color:#666;">Route based on OpenStreetMap road network.</small>
+              <small style="color:#666;">${
+                route.approximate
+                  ? "Routing is unavailable; showing the straight-line distance."
+                  : "Route based on OpenStreetMap road network."
+              }</small>
             </div>
           `)
           .openOn(studyMap);